@@ -37,6 +37,7 @@ playground = bolt.table("playground", [
     Field("postcode", str),
     Field("latitude", float),
     Field("longitude", float),
+    Field("geohash", str),
     Field("age_range", str),
     Field("age_categories", List[AgeGroup]),
     Field("avg_rating", float),
@@ -94,6 +95,7 @@ tag = bolt.table("tag", [
 # Create indexes for efficient querying
 playground.create_index(Index("region_idx", ["region"]))
 playground.create_index(Index("location_idx", ["latitude", "longitude"]))
+playground.create_index(Index("geohash_idx", ["geohash"]))
 playground.create_index(Index("popularity_idx", ["popularity_score"]))
 playground.create_index(Index("rating_idx", ["avg_rating"]))
 playground.create_index(Index("slug_idx", ["slug"], unique=True))
@@ -1,23 +1,161 @@
 import pandas as pd
-import json
-from typing import Dict, List
+import ast
+import ahocorasick
+import orjson
+import pyarrow as pa
+import pyarrow.csv as pv
+from typing import Dict, List, Tuple
 import numpy as np
+import os
 from datetime import datetime
 import re
+import pickle
 from geopy.distance import geodesic
+import pygeohash as pgh
+from scipy.spatial import cKDTree
 from slugify import slugify
 
+# Mean Earth radius; the spatial index works on unit vectors, so distances in
+# it are chords of the unit sphere
+EARTH_RADIUS_KM = 6371.0088
+
+def unit_vectors(latitudes, longitudes) -> np.ndarray:
+    """3D unit vectors for points given in degrees"""
+    lat = np.radians(np.asarray(latitudes, dtype='float64'))
+    lon = np.radians(np.asarray(longitudes, dtype='float64'))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+# Age suitability patterns, tried in order
+AGE_PATTERNS = [
+    re.compile(r'suitable for (\d+-\d+|\d+\+?) years', re.IGNORECASE),
+    re.compile(r'ages? (\d+-\d+|\d+\+?)', re.IGNORECASE),
+    re.compile(r'(\d+-\d+|\d+\+?) years? old', re.IGNORECASE)
+]
+
+# Equipment types with expanded categories
+EQUIPMENT_CATEGORIES = {
+    'climbing': ['climbing frame', 'monkey bars', 'climbing wall', 'rope climb'],
+    'swings': ['swing', 'baby swing', 'tire swing'],
+    'slides': ['slide', 'spiral slide', 'tube slide'],
+    'activity': ['sandbox', 'seesaw', 'trampoline', 'zipline', 'obstacle course'],
+    'sports': ['basketball', 'football', 'tennis', 'sports court'],
+    'water': ['splash pad', 'water play', 'fountain'],
+    'sensory': ['musical', 'sensory wall', 'interactive play']
+}
+
+# Enhanced amenities detection
+AMENITY_KEYWORDS = {
+    'has_parking': ['parking', 'car park', 'parking lot'],
+    'has_toilets': ['toilet', 'restroom', 'bathroom', 'changing facilities'],
+    'has_cafe': ['cafe', 'coffee', 'food', 'refreshment', 'kiosk'],
+    'has_seating': ['bench', 'seating', 'picnic', 'table'],
+    'has_shade': ['shade', 'shelter', 'covered', 'canopy'],
+    'has_fencing': ['fenced', 'enclosed', 'gated'],
+    'has_accessibility': ['wheelchair', 'accessible', 'disability', 'inclusive'],
+    'has_bike_parking': ['bike rack', 'bicycle parking', 'cycle stand']
+}
+
+# Safety features
+SAFETY_KEYWORDS = {
+    'has_safety_surface': ['rubber', 'safety surface', 'soft surface', 'impact absorbing'],
+    'has_lighting': ['lighting', 'lit', 'floodlight'],
+    'has_cctv': ['cctv', 'surveillance', 'monitored'],
+    'has_first_aid': ['first aid', 'medical', 'emergency']
+}
+
+# Flag column -> keywords, in output column order
+FEATURE_KEYWORDS = {
+    **{f'has_{category}': keywords for category, keywords in EQUIPMENT_CATEGORIES.items()},
+    **AMENITY_KEYWORDS,
+    **SAFETY_KEYWORDS
+}
+
+FEATURE_COLUMNS = list(FEATURE_KEYWORDS)
+
+def build_feature_automaton() -> ahocorasick.Automaton:
+    """Aho-Corasick automaton mapping each lowercased keyword to its flag column index"""
+    automaton = ahocorasick.Automaton()
+    for k, col in enumerate(FEATURE_COLUMNS):
+        for keyword in FEATURE_KEYWORDS[col]:
+            automaton.add_word(keyword.lower(), k)
+    automaton.make_automaton()
+    return automaton
+
+# Reports every keyword occurrence, including ones nested inside longer
+# matches (e.g. 'lit' in 'changing facilities'), so each flag is set exactly
+# as a separate substring search per flag would set it
+FEATURE_AUTOMATON = build_feature_automaton()
+
+# Geohash length stored per playground (9 chars is roughly a 5m cell)
+GEOHASH_PRECISION = 9
+
+# List-valued columns that are stringified for CSV output
+LIST_COLUMNS = ['tripadvisor_reviews', 'age_tags']
+
+# Columns read as strings: city so .str works even when a chunk has no
+# cities, and the Google IDs, some of which (owner_id, cid) overflow int64
+STRING_COLUMNS = ['city', 'owner_id', 'place_id', 'google_id', 'cid', 'kgmid', 'reviews_id', 'located_google_id']
+
+# Final output files; each is written to a .tmp sibling and moved into place
+# only once the whole directory has been built
+DIRECTORY_JSON_FILE = 'playground_directory.json'
+DIRECTORY_CSV_FILE = 'playground_directory.csv'
+SPATIAL_INDEX_FILE = 'playground_spatial_index.pkl'
+
+# Slug patterns matching python-slugify's output for ASCII input
+DIGIT_COMMA_PATTERN = re.compile(r'(?<=\d),(?=\d)')
+SLUG_SEPARATOR_PATTERN = re.compile(r'[^a-z0-9]+')
+
 class PlaygroundDirectoryProcessor:
-    def __init__(self, input_file: str):
+    def __init__(self, input_file: str, chunksize: int = 10_000):
         """Initialize the processor with input file"""
-        self.df = pd.read_csv(input_file)
+        self.input_file = input_file
+        self.chunksize = chunksize
+        self.df = pd.DataFrame()
         self.processed_entries = []
         
-        # Initialize missing columns
+        # Running aggregates over the whole file, filled in by scan_totals()
+        self.total_entries = 0
+        self.region_counts = {}
+        self.max_reviews = None
+        
+        # Spatial index over entry coordinates, built by build_spatial_index()
+        self.spatial_ids = []
+        self.spatial_coords = []
+        self.spatial_index = None
+        
+        # Single timestamp for the whole directory build
+        self.last_updated = None
+        
+    def prepare_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Initialize missing columns on a freshly read chunk"""
         required_columns = ['postcode', 'city', 'description', 'tripadvisor_reviews']
         for col in required_columns:
-            if col not in self.df.columns:
-                self.df[col] = ''
+            if col not in chunk.columns:
+                chunk[col] = ''
+        return chunk
+        
+    def iter_chunks(self, usecols=None):
+        """Yield the input CSV one chunk at a time"""
+        dtype = {col: str for col in STRING_COLUMNS}
+        for chunk in pd.read_csv(self.input_file, chunksize=self.chunksize, usecols=usecols, dtype=dtype):
+            yield self.prepare_chunk(chunk)
+            
+    def scan_totals(self):
+        """First pass: compute file-wide totals needed before entries are written"""
+        self.total_entries = 0
+        self.region_counts = {}
+        self.max_reviews = 0
+        usecols = lambda col: col in ('city', 'tripadvisor_reviews')
+        for chunk in self.iter_chunks(usecols=usecols):
+            self.total_entries += len(chunk)
+            regions = pd.Series(self.determine_regions(chunk['city'].str.strip()))
+            for region, count in regions.value_counts().items():
+                self.region_counts[region] = self.region_counts.get(region, 0) + int(count)
+            review_counts = [len(self.parse_reviews(reviews)) for reviews in chunk['tripadvisor_reviews'].tolist()]
+            self.max_reviews = max([self.max_reviews, *review_counts])
+        # Keep the order value_counts() would give over the full file
+        self.region_counts = dict(sorted(self.region_counts.items(), key=lambda item: -item[1]))
         
     def clean_and_standardize(self):
         """Clean and standardize the data"""
@@ -25,16 +163,26 @@ class PlaygroundDirectoryProcessor:
         self.df['city'] = self.df['city'].str.strip()
         
         # Create region field
-        self.df['region'] = self.df['city'].apply(self.determine_region)
+        self.df['region'] = self.determine_regions(self.df['city'])
         
         # Generate URL-friendly slugs
-        self.df['slug'] = self.df['name'].apply(lambda x: slugify(str(x)))
+        self.df['slug'] = [self.make_slug(str(name)) for name in self.df['name'].tolist()]
         
         # Clean and standardize postcodes
-        self.df['postcode'] = self.df['postcode'].astype(str).str.upper().str.strip()
+        self.df['postcode'] = [
+            str(postcode).strip().upper() if pd.notna(postcode) else ''
+            for postcode in self.df['postcode'].tolist()
+        ]
         
         # Convert reviews from string to structured data
-        self.df['tripadvisor_reviews'] = self.df['tripadvisor_reviews'].apply(self.parse_reviews)
+        self.df['tripadvisor_reviews'] = [self.parse_reviews(reviews) for reviews in self.df['tripadvisor_reviews'].tolist()]
+        
+    def make_slug(self, name: str) -> str:
+        """URL-friendly slug; plain ASCII names skip the full slugify machinery"""
+        if not name.isascii():
+            return slugify(name)
+        name = DIGIT_COMMA_PATTERN.sub('', name.lower())
+        return SLUG_SEPARATOR_PATTERN.sub('-', name).strip('-')
         
     def determine_region(self, city: str) -> str:
         """Determine the region based on city"""
@@ -47,156 +195,167 @@ class PlaygroundDirectoryProcessor:
             return "City of Glasgow"
         return "Other"
         
+    def determine_regions(self, cities: pd.Series) -> np.ndarray:
+        """Vectorized determine_region over a whole city column"""
+        city_lower = cities.fillna('').astype(str).str.lower()
+        return np.select(
+            [
+                city_lower == '',
+                city_lower.str.contains('london', regex=False),
+                city_lower.str.contains('glasgow', regex=False)
+            ],
+            ["Unknown", "Greater London", "City of Glasgow"],
+            default="Other"
+        )
+        
     def parse_reviews(self, review_str: str) -> List[Dict]:
         """Parse review string into structured data"""
         if not review_str or pd.isna(review_str) or review_str == '':
             return []
+        review_str = str(review_str)
+        try:
+            return orjson.loads(review_str)
+        except orjson.JSONDecodeError:
+            pass
+        # Reviews scraped as Python reprs use single quotes; literal_eval
+        # handles apostrophes inside the text that a quote swap would break
         try:
-            cleaned_str = str(review_str).replace("'", '"')
-            return json.loads(cleaned_str)
-        except:
+            return ast.literal_eval(review_str)
+        except (ValueError, SyntaxError, MemoryError, RecursionError):
             return []
             
     def extract_key_features(self):
         """Extract and structure key features for the directory"""
         # Age suitability with more detailed parsing
-        age_patterns = [
-            r'suitable for (\d+-\d+|\d+\+?) years',
-            r'ages? (\d+-\d+|\d+\+?)',
-            r'(\d+-\d+|\d+\+?) years? old'
-        ]
-        
         def extract_age_range(text):
             if pd.isna(text):
                 return None
             text = str(text)
-            for pattern in age_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
+            for pattern in AGE_PATTERNS:
+                match = pattern.search(text)
                 if match:
                     return match.group(1)
             return None
             
         self.df['age_range'] = self.df['description'].apply(extract_age_range)
         
-        # Equipment types with expanded categories
-        equipment_categories = {
-            'climbing': ['climbing frame', 'monkey bars', 'climbing wall', 'rope climb'],
-            'swings': ['swing', 'baby swing', 'tire swing'],
-            'slides': ['slide', 'spiral slide', 'tube slide'],
-            'activity': ['sandbox', 'seesaw', 'trampoline', 'zipline', 'obstacle course'],
-            'sports': ['basketball', 'football', 'tennis', 'sports court'],
-            'water': ['splash pad', 'water play', 'fountain'],
-            'sensory': ['musical', 'sensory wall', 'interactive play']
-        }
-        
-        for category, keywords in equipment_categories.items():
-            self.df[f'has_{category}'] = self.df['description'].str.contains('|'.join(keywords), case=False, na=False)
-            
-        # Enhanced amenities detection
-        amenity_keywords = {
-            'has_parking': ['parking', 'car park', 'parking lot'],
-            'has_toilets': ['toilet', 'restroom', 'bathroom', 'changing facilities'],
-            'has_cafe': ['cafe', 'coffee', 'food', 'refreshment', 'kiosk'],
-            'has_seating': ['bench', 'seating', 'picnic', 'table'],
-            'has_shade': ['shade', 'shelter', 'covered', 'canopy'],
-            'has_fencing': ['fenced', 'enclosed', 'gated'],
-            'has_accessibility': ['wheelchair', 'accessible', 'disability', 'inclusive'],
-            'has_bike_parking': ['bike rack', 'bicycle parking', 'cycle stand']
-        }
-        
-        for amenity, keywords in amenity_keywords.items():
-            self.df[amenity] = self.df['description'].str.contains('|'.join(keywords), case=False, na=False)
+        # Equipment, amenity and safety flags in a single pass over descriptions
+        descriptions = self.df['description'].fillna('').astype(str).str.lower().tolist()
+        flags = np.zeros((len(descriptions), len(FEATURE_COLUMNS)), dtype=bool)
+        for i, text in enumerate(descriptions):
+            for _, k in FEATURE_AUTOMATON.iter(text):
+                flags[i, k] = True
+        for k, col in enumerate(FEATURE_COLUMNS):
+            self.df[col] = flags[:, k]
             
-        # Safety features
-        safety_keywords = {
-            'has_safety_surface': ['rubber', 'safety surface', 'soft surface', 'impact absorbing'],
-            'has_lighting': ['lighting', 'lit', 'floodlight'],
-            'has_cctv': ['cctv', 'surveillance', 'monitored'],
-            'has_first_aid': ['first aid', 'medical', 'emergency']
-        }
-        
-        for feature, keywords in safety_keywords.items():
-            self.df[feature] = self.df['description'].str.contains('|'.join(keywords), case=False, na=False)
+        # Geohash for prefix-scan proximity queries
+        if 'latitude' in self.df.columns and 'longitude' in self.df.columns:
+            self.df['geohash'] = [
+                pgh.encode(lat, lon, precision=GEOHASH_PRECISION) if pd.notna(lat) and pd.notna(lon) else None
+                for lat, lon in zip(self.df['latitude'].tolist(), self.df['longitude'].tolist())
+            ]
+        else:
+            self.df['geohash'] = None
             
         # Calculate ratings and review metrics
         self.df['review_count'] = self.df['tripadvisor_reviews'].apply(len)
         
-        def calculate_avg_rating(reviews):
-            if not reviews:
-                return None
-            ratings = [review.get('rating', 0) for review in reviews if review.get('rating', 0) > 0]
-            return np.mean(ratings) if ratings else None
-            
-        self.df['avg_rating'] = self.df['tripadvisor_reviews'].apply(calculate_avg_rating)
+        # Average of positive ratings: flatten all ratings once, then
+        # reduce per playground with weighted bincounts
+        reviews_col = self.df['tripadvisor_reviews'].tolist()
+        review_lengths = np.fromiter((len(reviews) for reviews in reviews_col), dtype=np.int64, count=len(reviews_col))
+        ratings_flat = pd.to_numeric(
+            pd.Series(
+                [review.get('rating', 0) if isinstance(review, dict) else None
+                 for reviews in reviews_col for review in reviews],
+                dtype=object
+            ),
+            errors='coerce'
+        ).to_numpy(dtype='float64')
+        group_ids = np.repeat(np.arange(len(reviews_col)), review_lengths)
+        is_rated = ratings_flat > 0
+        rating_sums = np.bincount(group_ids, weights=np.where(is_rated, ratings_flat, 0.0), minlength=len(reviews_col))
+        rating_counts = np.bincount(group_ids, weights=is_rated, minlength=len(reviews_col))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.df['avg_rating'] = np.where(rating_counts > 0, rating_sums / rating_counts, np.nan)
         
         # Calculate popularity score
-        max_reviews = self.df['review_count'].max() if len(self.df) > 0 else 1
-        self.df['popularity_score'] = self.df.apply(
-            lambda row: (
-                (row['avg_rating'] * 0.7 if pd.notna(row['avg_rating']) else 0) +
-                (row['review_count'] / max_reviews * 0.3 if max_reviews > 0 else 0)
-            ),
-            axis=1
-        ).fillna(0)
+        if self.max_reviews is not None:
+            max_reviews = self.max_reviews
+        else:
+            max_reviews = self.df['review_count'].max() if len(self.df) > 0 else 1
+        avg = self.df['avg_rating'].to_numpy(dtype='float64')
+        review_count = self.df['review_count'].to_numpy(dtype='float64')
+        self.df['popularity_score'] = (
+            np.where(np.isnan(avg), 0.0, avg) * 0.7 +
+            review_count / max(max_reviews, 1) * 0.3
+        )
         
     def create_search_metadata(self):
         """Create enhanced searchable metadata fields"""
-        # Initialize tags
-        self.df['search_tags'] = ''
-        self.df['primary_tags'] = ''
-        self.df['feature_tags'] = ''
+        # Tags are collected per row as lists and joined once at the end
+        n = len(self.df)
+        primary = [[] for _ in range(n)]
+        feature = [[] for _ in range(n)]
         
+        def add_tag(tags, mask, tag):
+            for i in np.flatnonzero(np.asarray(mask, dtype=bool)):
+                tags[i].append(tag)
+                
         # Add equipment category tags
         equipment_cols = [col for col in self.df.columns if col.startswith('has_')]
         for col in equipment_cols:
-            self.df.loc[self.df[col], 'feature_tags'] += f" {col.replace('has_', '')}"
+            add_tag(feature, self.df[col], col.replace('has_', ''))
             
         # Add age range tags with categories
-        def categorize_age(age_range):
-            if pd.isna(age_range):
-                return []
-            tags = []
-            age_str = str(age_range)
-            if any(x in age_str for x in ['0-', '1-', '2-', '3-', '4-']):
-                tags.append('toddler_friendly')
-            if any(x in age_str for x in ['5-', '6-', '7-', '8-']):
-                tags.append('child_friendly')
-            if any(x in age_str for x in ['9-', '10-', '11-', '12+']):
-                tags.append('older_kids')
-            return tags
+        age_str = self.df['age_range'].fillna('').astype(str)
+        is_toddler = age_str.str.contains(r'[0-4]-').tolist()
+        is_child = age_str.str.contains(r'[5-8]-').tolist()
+        is_older = age_str.str.contains(r'9-|10-|11-|12\+').tolist()
+        self.df['age_tags'] = [
+            [tag for tag, flag in (('toddler_friendly', toddler), ('child_friendly', child), ('older_kids', older)) if flag]
+            for toddler, child, older in zip(is_toddler, is_child, is_older)
+        ]
+        for tags, age_tags in zip(primary, self.df['age_tags'].tolist()):
+            tags.extend(age_tags)
             
-        self.df['age_tags'] = self.df['age_range'].apply(categorize_age)
-        self.df['primary_tags'] += self.df['age_tags'].apply(lambda x: ' ' + ' '.join(x))
-        
         # Add rating-based tags
-        self.df.loc[self.df['avg_rating'] >= 4.5, 'primary_tags'] += ' top_rated'
-        self.df.loc[self.df['avg_rating'] >= 4.0, 'primary_tags'] += ' highly_rated'
-        self.df.loc[self.df['review_count'] >= 10, 'primary_tags'] += ' popular'
+        add_tag(primary, self.df['avg_rating'] >= 4.5, 'top_rated')
+        add_tag(primary, self.df['avg_rating'] >= 4.0, 'highly_rated')
+        add_tag(primary, self.df['review_count'] >= 10, 'popular')
         
         # Add amenity combination tags
-        self.df.loc[
-            self.df['has_toilets'] & self.df['has_parking'] & self.df['has_cafe'],
-            'primary_tags'
-        ] += ' family_friendly'
-        
-        self.df.loc[
-            self.df['has_fencing'] & self.df['has_safety_surface'],
-            'primary_tags'
-        ] += ' safe_play'
+        add_tag(primary, self.df['has_toilets'] & self.df['has_parking'] & self.df['has_cafe'], 'family_friendly')
+        add_tag(primary, self.df['has_fencing'] & self.df['has_safety_surface'], 'safe_play')
         
         # Combine all tags
-        self.df['search_tags'] = (
-            self.df['primary_tags'] + ' ' + 
-            self.df['feature_tags'] + ' ' + 
-            self.df['region'].str.lower()
-        )
+        regions = self.df['region'].str.lower().tolist()
+        self.df['primary_tags'] = [' '.join(tags) for tags in primary]
+        self.df['feature_tags'] = [' '.join(tags) for tags in feature]
+        self.df['search_tags'] = [
+            ' '.join(primary_tags + feature_tags + [region])
+            for primary_tags, feature_tags, region in zip(primary, feature, regions)
+        ]
         
-        # Clean tags
-        for tag_col in ['search_tags', 'primary_tags', 'feature_tags']:
-            self.df[tag_col] = self.df[tag_col].str.strip().str.lower()
+    def partition_flag_columns(self, columns) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+        """Split has_* columns into (key, column) pairs for amenities and safety"""
+        amenity_cols = [
+            (col.replace('has_', ''), col)
+            for col in columns if col.startswith('has_') and not col.startswith('has_safety_')
+        ]
+        safety_cols = [
+            (col.replace('has_safety_', ''), col)
+            for col in columns if col.startswith('has_safety_')
+        ]
+        return amenity_cols, safety_cols
         
-    def format_directory_entry(self, row) -> Dict:
+    def format_directory_entry(self, entry_id, row: Dict, amenity_cols=None, safety_cols=None, last_updated=None) -> Dict:
         """Format a single directory entry with enhanced structure"""
+        if amenity_cols is None or safety_cols is None:
+            amenity_cols, safety_cols = self.partition_flag_columns(row)
+        if last_updated is None:
+            last_updated = datetime.now().isoformat()
+            
         # Calculate nearby amenities (example: could be expanded with real data)
         nearby_amenities = {
             'restaurants': False,
@@ -212,7 +371,7 @@ class PlaygroundDirectoryProcessor:
         }
         
         return {
-            'id': row.name,
+            'id': entry_id,
             'name': row['name'],
             'slug': row['slug'],
             'location': {
@@ -220,6 +379,7 @@ class PlaygroundDirectoryProcessor:
                 'city': row['city'],
                 'region': row['region'],
                 'postcode': row.get('postcode', ''),
+                'geohash': row.get('geohash', None),
                 'coordinates': {
                     'latitude': row.get('latitude', None),
                     'longitude': row.get('longitude', None)
@@ -228,18 +388,18 @@ class PlaygroundDirectoryProcessor:
             'features': {
                 'equipment_categories': {
                     category: row.get(f'has_{category}', False)
-                    for category in ['climbing', 'swings', 'slides', 'activity', 'sports', 'water', 'sensory']
+                    for category in EQUIPMENT_CATEGORIES
                 },
                 'age_range': row.get('age_range', None),
                 'age_categories': row['age_tags'],
                 'amenities': {
-                    amenity.replace('has_', ''): row.get(amenity, False)
-                    for amenity in row.index if amenity.startswith('has_')
+                    amenity: row.get(col, False)
+                    for amenity, col in amenity_cols
                 }
             },
             'safety': {
-                feature.replace('has_safety_', ''): row.get(feature, False)
-                for feature in row.index if feature.startswith('has_safety_')
+                feature: row.get(col, False)
+                for feature, col in safety_cols
             },
             'ratings': {
                 'average': row.get('avg_rating', None),
@@ -255,51 +415,135 @@ class PlaygroundDirectoryProcessor:
             'additional_info': {
                 'nearby_amenities': nearby_amenities,
                 'opening_hours': opening_hours,
-                'last_updated': datetime.now().isoformat()
+                'last_updated': last_updated
             },
             'description': row.get('description', '')
         }
         
     def create_directory_entries(self):
         """Create structured directory entries"""
-        self.processed_entries = []
-        for _, row in self.df.iterrows():
-            entry = self.format_directory_entry(row)
-            self.processed_entries.append(entry)
+        amenity_cols, safety_cols = self.partition_flag_columns(self.df.columns)
+        last_updated = self.last_updated or datetime.now().isoformat()
+        records = self.df.to_dict('records')
+        self.processed_entries = [
+            self.format_directory_entry(entry_id, row, amenity_cols, safety_cols, last_updated)
+            for entry_id, row in zip(self.df.index, records)
+        ]
             
+    def write_csv_chunk(self, csv_file, include_header: bool):
+        """Append the current chunk to the CSV output with Arrow's CSV writer"""
+        csv_df = self.df.copy()
+        # Arrow's CSV writer has no list type support; write lists as their repr
+        for col in LIST_COLUMNS:
+            if col in csv_df.columns:
+                csv_df[col] = [str(value) for value in csv_df[col].tolist()]
+        pv.write_csv(
+            pa.Table.from_pandas(csv_df, preserve_index=False),
+            csv_file,
+            write_options=pv.WriteOptions(include_header=include_header)
+        )
+        
+    def collect_coordinates(self):
+        """Record (id, latitude, longitude) for entries of the current chunk"""
+        for entry in self.processed_entries:
+            coordinates = entry['location']['coordinates']
+            latitude, longitude = coordinates['latitude'], coordinates['longitude']
+            if pd.notna(latitude) and pd.notna(longitude):
+                self.spatial_ids.append(entry['id'])
+                self.spatial_coords.append((latitude, longitude))
+                
+    def build_spatial_index(self):
+        """Build a k-d tree over the collected entry coordinates"""
+        # Degrees are not a metric space (a degree of longitude shrinks with
+        # latitude), so index points as unit vectors, where straight-line
+        # distance orders points the same way as great-circle distance
+        coords = np.array(self.spatial_coords, dtype='float64').reshape(-1, 2)
+        self.spatial_index = cKDTree(unit_vectors(coords[:, 0], coords[:, 1]))
+        
+    def nearest(self, latitude: float, longitude: float, k: int = 5) -> List:
+        """Ids of the k entries closest to a point"""
+        if self.spatial_index is None or not self.spatial_ids:
+            return []
+        k = min(k, len(self.spatial_ids))
+        _, indices = self.spatial_index.query(unit_vectors(latitude, longitude), k=k)
+        return [self.spatial_ids[i] for i in np.atleast_1d(indices)]
+        
+    def within_radius(self, latitude: float, longitude: float, radius_km: float) -> List:
+        """Ids of entries within radius_km of a point, nearest first"""
+        if self.spatial_index is None or not self.spatial_ids:
+            return []
+        # Prune with the chord of the radius on a sphere, widened 1% to cover
+        # the ellipsoid, then keep only candidates within the geodesic distance
+        angle = min(radius_km * 1.01 / EARTH_RADIUS_KM, np.pi)
+        chord = 2 * np.sin(angle / 2)
+        candidates = self.spatial_index.query_ball_point(unit_vectors(latitude, longitude), r=chord)
+        matches = []
+        for i in candidates:
+            distance = geodesic((latitude, longitude), self.spatial_coords[i]).km
+            if distance <= radius_km:
+                matches.append((distance, self.spatial_ids[i]))
+        return [entry_id for _, entry_id in sorted(matches)]
+        
     def save_directory(self):
-        """Save the unified directory"""
-        # Save as JSON for richer data structure
-        with open('playground_directory.json', 'w') as f:
-            json.dump({
-                'metadata': {
-                    'total_entries': len(self.processed_entries),
-                    'regions': self.df['region'].value_counts().to_dict(),
-                    'last_updated': datetime.now().isoformat()
-                },
-                'entries': self.processed_entries
-            }, f, indent=2)
+        """Process the input chunk by chunk and stream the unified directory to disk"""
+        if self.max_reviews is None:
+            self.scan_totals()
+        self.last_updated = datetime.now().isoformat()
+            
+        # Save as JSON for richer data structure; metadata comes from the first
+        # pass so entries can be written as each chunk is processed
+        json_options = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        metadata = orjson.dumps({
+            'total_entries': self.total_entries,
+            'regions': self.region_counts,
+            'last_updated': self.last_updated
+        }, option=json_options).replace(b'\n', b'\n  ')
+        
+        outputs = [DIRECTORY_JSON_FILE, DIRECTORY_CSV_FILE, SPATIAL_INDEX_FILE]
+        with open(DIRECTORY_JSON_FILE + '.tmp', 'wb') as f, \
+                open(DIRECTORY_CSV_FILE + '.tmp', 'wb') as csv_file:
+            f.write(b'{\n  "metadata": ' + metadata + b',\n  "entries": [')
+            first_entry = True
+            for chunk_number, chunk in enumerate(self.iter_chunks()):
+                self.df = chunk
+                self.clean_and_standardize()
+                self.extract_key_features()
+                self.create_search_metadata()
+                self.create_directory_entries()
+                
+                for entry in self.processed_entries:
+                    f.write(b'\n' if first_entry else b',\n')
+                    f.write(b'    ' + orjson.dumps(entry, option=json_options).replace(b'\n', b'\n    '))
+                    first_entry = False
+                    
+                # Save a CSV version for compatibility
+                self.write_csv_chunk(csv_file, include_header=chunk_number == 0)
+                self.collect_coordinates()
+            f.write(b'\n  ]\n}' if not first_entry else b']\n}')
+            
+        # Save the spatial index alongside the JSON for nearby lookups
+        self.build_spatial_index()
+        with open(SPATIAL_INDEX_FILE + '.tmp', 'wb') as f:
+            pickle.dump({'ids': self.spatial_ids, 'tree': self.spatial_index}, f)
             
-        # Save a CSV version for compatibility
-        self.df.to_csv('playground_directory.csv', index=False)
+        # Replace the previous outputs only now, so a failed run leaves them intact
+        for path in outputs:
+            os.replace(path + '.tmp', path)
         
         # Print summary
         print("\nDirectory Creation Summary:")
         print("-" * 50)
-        print(f"Total playgrounds: {len(self.processed_entries)}")
+        print(f"Total playgrounds: {self.total_entries}")
         print("\nBy Region:")
-        for region, count in self.df['region'].value_counts().items():
+        for region, count in self.region_counts.items():
             print(f"{region}: {count}")
             
 def main():
     """Main function to process playground directory"""
     processor = PlaygroundDirectoryProcessor("playground_clean - v.3_with_descriptions_with_additional_reviews.csv")
     
-    # Process the data
-    processor.clean_and_standardize()
-    processor.extract_key_features()
-    processor.create_search_metadata()
-    processor.create_directory_entries()
+    # Process the data in chunks: totals first, then the streamed directory
+    processor.scan_totals()
     processor.save_directory()
     
 if __name__ == "__main__":
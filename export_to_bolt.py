@@ -1,10 +1,42 @@
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any
 from neo4j import GraphDatabase
+import pyarrow as pa
+import pyarrow.parquet as pq
 import logging
 from tqdm import tqdm
 
+# Records pulled per Bolt PULL message (driver default is 1000)
+FETCH_SIZE = 10_000
+
+# Rows sent per UNWIND write transaction on import
+BATCH_SIZE = 5_000
+
+# Records buffered per Parquet row group on export
+PARQUET_BATCH_SIZE = 10_000
+
+NODE_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("labels", pa.list_(pa.string())),
+    ("properties", pa.string()),
+])
+
+RELATIONSHIP_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("type", pa.string()),
+    ("source_id", pa.string()),
+    ("target_id", pa.string()),
+    ("properties", pa.string()),
+])
+
+def batched(items: List[Any], size: int):
+    """Yield successive slices of at most size items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
 class BoltExporter:
     def __init__(self, source_uri: str, source_username: str, source_password: str,
                  target_uri: str = None, target_username: str = None, target_password: str = None):
@@ -21,94 +53,118 @@ class BoltExporter:
         if self.target_driver:
             self.target_driver.close()
             
-    def export_to_file(self, output_file: str):
-        """Export Neo4j data to a Bolt-compatible format file"""
-        data = {
-            "metadata": {
-                "exported_at": datetime.now().isoformat(),
-                "format_version": "1.0"
-            },
-            "nodes": [],
-            "relationships": []
-        }
-        
-        with self.source_driver.session() as session:
-            # Export nodes
+    def iter_nodes(self) -> Iterator[Dict[str, Any]]:
+        """Stream Playground, Value (equipment types) and Equipment nodes in one scan"""
+        with self.source_driver.session(fetch_size=FETCH_SIZE) as session:
             self.logger.info("Exporting nodes...")
-            
-            # Export Playground nodes
-            playground_query = """
-            MATCH (p:Playground)
-            RETURN p
+            # Point and DateTime values are flattened in Cypher so every
+            # returned value is a primitive and the driver never builds
+            # spatial/temporal objects
+            node_query = """
+            MATCH (n)
+            WHERE n:Playground OR n:Value OR n:Equipment
+            RETURN elementId(n) AS id, labels(n) AS labels,
+                   n{.*,
+                     location: CASE WHEN n.location IS NULL THEN null
+                               ELSE {latitude: n.location.latitude, longitude: n.location.longitude} END,
+                     last_updated: toString(n.last_updated)
+                   } AS properties
             """
-            playgrounds = session.run(playground_query)
-            for record in tqdm(playgrounds, desc="Exporting playgrounds"):
-                node = record["p"]
-                node_data = {
-                    "id": node.element_id,
-                    "labels": list(node.labels),
-                    "properties": dict(node.items())
+            nodes = session.run(node_query)
+            for record in tqdm(nodes, desc="Exporting nodes", position=0):
+                # Stored properties are never null, so nulls only come from
+                # the flattened keys above on nodes that lack them
+                yield {
+                    "id": record["id"],
+                    "labels": record["labels"],
+                    "properties": {k: v for k, v in record["properties"].items() if v is not None}
                 }
-                # Convert Neo4j Point to dict
-                if "location" in node_data["properties"]:
-                    location = node_data["properties"]["location"]
-                    node_data["properties"]["location"] = {
-                        "latitude": location.latitude,
-                        "longitude": location.longitude
-                    }
-                # Convert datetime to ISO format
-                if "last_updated" in node_data["properties"]:
-                    node_data["properties"]["last_updated"] = node_data["properties"]["last_updated"].isoformat()
-                data["nodes"].append(node_data)
                 
-            # Export Value nodes (equipment types)
-            value_query = """
-            MATCH (v:Value)
-            RETURN v
-            """
-            values = session.run(value_query)
-            for record in tqdm(values, desc="Exporting values"):
-                node = record["v"]
-                node_data = {
-                    "id": node.element_id,
-                    "labels": list(node.labels),
-                    "properties": dict(node.items())
-                }
-                data["nodes"].append(node_data)
-                
-            # Export Equipment nodes
-            equipment_query = """
-            MATCH (e:Equipment)
-            RETURN e
-            """
-            equipment = session.run(equipment_query)
-            for record in tqdm(equipment, desc="Exporting equipment"):
-                node = record["e"]
-                node_data = {
-                    "id": node.element_id,
-                    "labels": list(node.labels),
-                    "properties": dict(node.items())
-                }
-                data["nodes"].append(node_data)
-                
-            # Export relationships
+    def iter_relationships(self) -> Iterator[Dict[str, Any]]:
+        """Stream relationships as scalar ids and property maps only"""
+        with self.source_driver.session(fetch_size=FETCH_SIZE) as session:
             self.logger.info("Exporting relationships...")
             rel_query = """
-            MATCH ()-[r]->()
-            RETURN r, startNode(r) as source, endNode(r) as target
+            MATCH (source)-[r]->(target)
+            RETURN elementId(r) AS id, type(r) AS type,
+                   elementId(source) AS source_id, elementId(target) AS target_id,
+                   properties(r) AS properties
             """
             relationships = session.run(rel_query)
-            for record in tqdm(relationships, desc="Exporting relationships"):
-                rel = record["r"]
-                rel_data = {
-                    "id": rel.element_id,
-                    "type": rel.type,
-                    "source_id": record["source"].element_id,
-                    "target_id": record["target"].element_id,
-                    "properties": dict(rel.items())
+            for record in tqdm(relationships, desc="Exporting relationships", position=1):
+                yield {
+                    "id": record["id"],
+                    "type": record["type"],
+                    "source_id": record["source_id"],
+                    "target_id": record["target_id"],
+                    "properties": record["properties"]
                 }
-                data["relationships"].append(rel_data)
                 
+    def export_nodes(self) -> List[Dict[str, Any]]:
+        """Fetch all exported nodes into a list"""
+        return list(self.iter_nodes())
+        
+    def export_relationships(self) -> List[Dict[str, Any]]:
+        """Fetch all relationships into a list"""
+        return list(self.iter_relationships())
+        
+    def write_parquet(self, path: str, records: Iterator[Dict[str, Any]], schema: pa.Schema) -> int:
+        """Write records to a Parquet file in row groups of PARQUET_BATCH_SIZE"""
+        count = 0
+        with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+            batch = []
+            for record in records:
+                # Property maps vary per label/type; store them as JSON text
+                record["properties"] = json.dumps(record["properties"], default=str)
+                batch.append(record)
+                if len(batch) >= PARQUET_BATCH_SIZE:
+                    writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                    count += len(batch)
+                    batch = []
+            if batch:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+        return count
+        
+    def export_to_parquet(self, output_dir: str):
+        """Export Neo4j data to nodes.parquet and relationships.parquet, streaming in batches"""
+        os.makedirs(output_dir, exist_ok=True)
+        nodes_path = os.path.join(output_dir, "nodes.parquet")
+        relationships_path = os.path.join(output_dir, "relationships.parquet")
+        
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            nodes_future = executor.submit(self.write_parquet, nodes_path, self.iter_nodes(), NODE_SCHEMA)
+            relationships_future = executor.submit(
+                self.write_parquet, relationships_path, self.iter_relationships(), RELATIONSHIP_SCHEMA
+            )
+            node_count = nodes_future.result()
+            relationship_count = relationships_future.result()
+            
+        self.logger.info(f"Export completed. Data written to {output_dir}")
+        
+        # Print summary
+        print("\nExport Summary:")
+        print("-" * 50)
+        print(f"Total nodes: {node_count}")
+        print(f"Total relationships: {relationship_count}")
+        
+    def export_to_file(self, output_file: str):
+        """Export Neo4j data to a Bolt-compatible format file"""
+        # Nodes and relationships are independent reads; run them on separate
+        # sessions concurrently (the driver is thread-safe, sessions are not)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            nodes_future = executor.submit(self.export_nodes)
+            relationships_future = executor.submit(self.export_relationships)
+            
+            data = {
+                "metadata": {
+                    "exported_at": datetime.now().isoformat(),
+                    "format_version": "1.0"
+                },
+                "nodes": nodes_future.result(),
+                "relationships": relationships_future.result()
+            }
+            
         # Write to file
         with open(output_file, 'w') as f:
             json.dump(data, f, indent=2)
@@ -135,46 +191,83 @@ class BoltExporter:
             
         with open(input_file, 'r') as f:
             data = json.load(f)
+        self.import_data(data)
+        
+    def import_from_parquet(self, input_dir: str):
+        """Import data written by export_to_parquet into Neo4j"""
+        if not self.target_driver:
+            raise ValueError("Target Neo4j connection details not provided")
             
+        data = {}
+        for key, filename in (("nodes", "nodes.parquet"), ("relationships", "relationships.parquet")):
+            records = pq.read_table(os.path.join(input_dir, filename)).to_pylist()
+            for record in records:
+                record["properties"] = json.loads(record["properties"])
+            data[key] = records
+        self.import_data(data)
+        
+    def import_data(self, data: Dict[str, List[Dict[str, Any]]]):
+        """Write exported nodes and relationships into the target database"""
         with self.target_driver.session() as session:
             # Clear existing data
             self.logger.info("Clearing existing data...")
             session.run("MATCH (n) DETACH DELETE n")
             
-            # Create nodes
+            # Create nodes, one UNWIND batch per label set
             self.logger.info("Creating nodes...")
-            for node in tqdm(data["nodes"], desc="Creating nodes"):
-                labels = ":".join(node["labels"])
-                props = {k: v for k, v in node["properties"].items()}
-                
-                # Handle location point
-                if "location" in props:
-                    loc = props["location"]
-                    props["location"] = f"point({{latitude: {loc['latitude']}, longitude: {loc['longitude']}}})"
-                    
-                # Create node
-                create_query = f"""
-                CREATE (n:{labels})
-                SET n = $props
-                """
-                session.run(create_query, props=props)
+            nodes_by_labels = {}
+            for node in data["nodes"]:
+                props = dict(node["properties"])
+                location = props.pop("location", None)
+                nodes_by_labels.setdefault(":".join(node["labels"]), []).append({
+                    "id": node["id"],
+                    "props": props,
+                    "location": location
+                })
                 
-            # Create relationships
+            # Exported element ids -> element ids of the newly created nodes
+            id_map = {}
+            with tqdm(total=len(data["nodes"]), desc="Creating nodes") as progress:
+                for labels, rows in nodes_by_labels.items():
+                    create_query = f"""
+                    UNWIND $rows AS row
+                    CREATE (n:{labels})
+                    SET n = row.props
+                    SET n.location = CASE WHEN row.location IS NULL THEN null ELSE point(row.location) END
+                    RETURN row.id AS export_id, elementId(n) AS id
+                    """
+                    for batch in batched(rows, BATCH_SIZE):
+                        created = session.execute_write(
+                            lambda tx: tx.run(create_query, rows=batch).data()
+                        )
+                        id_map.update((record["export_id"], record["id"]) for record in created)
+                        progress.update(len(batch))
+                        
+            # Create relationships, one UNWIND batch per relationship type
             self.logger.info("Creating relationships...")
-            for rel in tqdm(data["relationships"], desc="Creating relationships"):
-                create_query = f"""
-                MATCH (source) WHERE id(source) = $source_id
-                MATCH (target) WHERE id(target) = $target_id
-                CREATE (source)-[r:{rel['type']}]->(target)
-                SET r = $props
-                """
-                session.run(
-                    create_query,
-                    source_id=rel["source_id"],
-                    target_id=rel["target_id"],
-                    props=rel["properties"]
-                )
+            rels_by_type = {}
+            for rel in data["relationships"]:
+                rels_by_type.setdefault(rel["type"], []).append({
+                    "source_id": id_map.get(rel["source_id"]),
+                    "target_id": id_map.get(rel["target_id"]),
+                    "props": rel["properties"]
+                })
                 
+            with tqdm(total=len(data["relationships"]), desc="Creating relationships") as progress:
+                for rel_type, rows in rels_by_type.items():
+                    create_query = f"""
+                    UNWIND $rows AS row
+                    MATCH (source) WHERE elementId(source) = row.source_id
+                    MATCH (target) WHERE elementId(target) = row.target_id
+                    CREATE (source)-[r:{rel_type}]->(target)
+                    SET r = row.props
+                    """
+                    for batch in batched(rows, BATCH_SIZE):
+                        session.execute_write(
+                            lambda tx: tx.run(create_query, rows=batch).consume()
+                        )
+                        progress.update(len(batch))
+                        
         self.logger.info("Import completed successfully")
 
 def main():
@@ -192,7 +285,7 @@ def main():
     
     try:
         exporter = BoltExporter(source_uri, source_username, source_password)
-        exporter.export_to_file("playground_data_bolt.json")
+        exporter.export_to_parquet("playground_data_bolt")
         exporter.close()
     except Exception as e:
         print(f"Error during export: {str(e)}")
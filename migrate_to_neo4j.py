@@ -1,54 +1,319 @@
+import argparse
+import asyncio
+import ahocorasick
+import csv
+import hashlib
 import json
+import multiprocessing as mp
+import os
+import shlex
+import shutil
+import subprocess
 from datetime import datetime
-from typing import Dict, List
-from neo4j import GraphDatabase
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+import ijson
+from neo4j import AsyncGraphDatabase, GraphDatabase
 import logging
 from tqdm import tqdm
 import requests
-from time import sleep
+from requests.adapters import HTTPAdapter
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from rate_limiter import RateLimiter
+
+# Playgrounds written per UNWIND statement, and per committed transaction
+MIGRATION_BATCH_SIZE = 500
+MIGRATION_COMMIT_SIZE = 1000
+MIGRATION_CONCURRENCY = 4
+
+AMENITY_FIELDS = ['parking', 'toilets', 'cafe', 'seating', 'shade', 'fencing', 'accessibility', 'bike_parking']
+SAFETY_FIELDS = ['lighting', 'cctv', 'first_aid']
+
+# Writes a whole batch of playgrounds with their equipment, reviews and
+# tags; migrate_batch_query joins the parts. Amenity and safety flags are
+# has_* properties on the playground itself.
+MIGRATE_PLAYGROUND_QUERY = """
+UNWIND $rows AS row
+MERGE (p:Playground {slug: row.slug})
+SET p += row.props,
+    p += row.amenities,
+    p += row.safety,
+    p.name = row.name,
+    p.region = row.region,
+    p.city = row.city,
+    p.postcode = row.postcode,
+    p.location = point({latitude: row.latitude, longitude: row.longitude}),
+    p.address = row.address,
+    p.last_updated = datetime(row.last_updated)
+"""
+
+MIGRATE_RELATED_QUERY = """
+CALL {
+    WITH p, row
+    UNWIND row.equipment AS equipment
+    MERGE (et:Value {name: equipment.type, category: 'EquipmentType'})
+    CREATE (e:Equipment {has_equipment: equipment.has_equipment})
+    CREATE (p)-[:HAS_EQUIPMENT]->(e)-[:IS_TYPE]->(et)
+}
+
+CALL {
+    WITH p, row
+    UNWIND row.reviews AS review
+    CREATE (r:Review {
+        title: review.title,
+        text: review.text,
+        rating: review.rating,
+        date: datetime(review.date),
+        source: review.source
+    })
+    CREATE (p)-[:HAS_REVIEW]->(r)
+}
+
+CALL {
+    WITH p, row
+    UNWIND row.tags AS tag
+    MERGE (t:Tag {value: tag.value, category: tag.category})
+    CREATE (p)-[:TAGGED_WITH]->(t)
+}
+"""
+
+# Unless the migration started from a cleared graph, a playground's
+# existing related nodes are removed before they are recreated so reruns
+# replace them
+RELATED_CLEANUP = """
+WITH p, row
+OPTIONAL MATCH (p)-[]->(old)
+DETACH DELETE old
+WITH DISTINCT p, row
+"""
+
+def migrate_batch_query(cleanup: bool) -> str:
+    """Batch write query, with or without the per-playground cleanup"""
+    return MIGRATE_PLAYGROUND_QUERY + (RELATED_CLEANUP if cleanup else "WITH p, row\n") + MIGRATE_RELATED_QUERY
+
+# Slug component translation tables: spaces become hyphens in city and
+# postcode, and dots become 'p' in coordinates for a valid slug
+SLUG_SPACE_TRANS = str.maketrans({' ': '-'})
+COORD_SLUG_TRANS = str.maketrans({'.': 'p'})
+
+@lru_cache(maxsize=None)
+def slug_component(value: str) -> str:
+    """Slug form of a city or postcode, memoized since they recur across entries"""
+    return value.lower().translate(SLUG_SPACE_TRANS)
+
+# Stored content hashes for a batch of slugs, to skip unchanged entries
+STORED_HASHES_QUERY = """
+UNWIND $slugs AS slug
+MATCH (p:Playground {slug: slug})
+RETURN slug, p.content_hash AS content_hash
+"""
+
+# Labels written by this migrator, including the Amenities and Safety nodes
+# of earlier versions. Fresh migrations delete only these, once up front, in
+# bounded transactions; the rest of the database is left alone.
+MIGRATED_LABELS = ['Playground', 'Equipment', 'Review', 'Tag', 'Value', 'Amenities', 'Safety']
+CLEAR_DATABASE_QUERY = (
+    "MATCH (n) WHERE " + " OR ".join(f"n:{label}" for label in MIGRATED_LABELS)
+    + " CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS"
+)
+
+# Keep every MERGE in the batch query an index lookup instead of a label
+# scan. Tag and Value nodes are shared between concurrent transactions, so
+# they need uniqueness constraints (not plain indexes) for MERGE to lock
+# instead of creating duplicates. The plain indexes from earlier runs are
+# dropped first because they cover the same schema as the constraints.
+SCHEMA_QUERIES = [
+    "CREATE CONSTRAINT playground_slug IF NOT EXISTS FOR (p:Playground) REQUIRE p.slug IS UNIQUE",
+    "DROP INDEX tag_value_category IF EXISTS",
+    "DROP INDEX value_name_category IF EXISTS",
+    "CREATE CONSTRAINT tag_value_category_unique IF NOT EXISTS FOR (t:Tag) REQUIRE (t.value, t.category) IS UNIQUE",
+    "CREATE CONSTRAINT value_name_category_unique IF NOT EXISTS FOR (v:Value) REQUIRE (v.name, v.category) IS UNIQUE"
+]
+
+# Offline bulk load: one neo4j-admin CSV per label and relationship type,
+# with typed headers. IDs are only unique within their ID space.
+BULK_IMPORT_DIR = 'neo4j_import'
+BULK_NODE_FILES = {
+    'Playground': ('playgrounds.csv', [
+        'slug:ID(Playground)', 'name', 'region', 'city', 'postcode', 'address',
+        'location:point{crs:WGS-84}', 'description', 'age_range', 'avg_rating:double',
+        'review_count:int', 'popularity_score:double', 'base_slug', 'content_hash', 'last_updated:datetime',
+        *(f'has_{k}:boolean' for k in AMENITY_FIELDS),
+        'has_safety_surface:boolean', *(f'has_{k}:boolean' for k in SAFETY_FIELDS)
+    ]),
+    'Equipment': ('equipment.csv', [':ID(Equipment)', 'has_equipment:boolean']),
+    'Value': ('equipment_types.csv', ['name:ID(Value)', 'category']),
+    'Review': ('reviews.csv', [':ID(Review)', 'title', 'text', 'rating:double', 'date:datetime', 'source']),
+    'Tag': ('tags.csv', [':ID(Tag)', 'value', 'category'])
+}
+BULK_RELATIONSHIP_FILES = {
+    'HAS_EQUIPMENT': ('has_equipment.csv', [':START_ID(Playground)', ':END_ID(Equipment)']),
+    'IS_TYPE': ('is_type.csv', [':START_ID(Equipment)', ':END_ID(Value)']),
+    'HAS_REVIEW': ('has_review.csv', [':START_ID(Playground)', ':END_ID(Review)']),
+    'TAGGED_WITH': ('tagged_with.csv', [':START_ID(Playground)', ':END_ID(Tag)'])
+}
+
+# Common location indicators that might appear in names and addresses
+STREET_INDICATORS = frozenset({
+    'street', 'road', 'avenue', 'lane', 'way', 'close', 'drive',
+    'grove', 'gardens', 'park', 'square', 'hill', 'place', 'terrace',
+    'court', 'crescent', 'boulevard', 'row', 'walk', 'alley'
+})
+
+def build_street_automaton() -> ahocorasick.Automaton:
+    """Aho-Corasick automaton mapping each street indicator to itself"""
+    automaton = ahocorasick.Automaton()
+    for indicator in STREET_INDICATORS:
+        automaton.add_word(indicator, indicator)
+    automaton.make_automaton()
+    return automaton
+
+# One pass over a lowercased string finds every indicator in it. Address
+# parts match on substrings (like 'way' in 'Broadway'); names only on whole
+# words, which get_location_from_name checks from the match boundaries.
+STREET_AUTOMATON = build_street_automaton()
+
+# Strictly generic names that don't include location information
+GENERIC_NAMES = frozenset({
+    'playground',
+    'play area',
+    "children's playground",
+    'kids playground',
+    'play park',
+    'playpark',
+    'kids playzone',
+    'play ground',
+    'childrens playground',
+    'kids play area',
+    'play space',
+    'playspace'
+})
+
+# Prefixes that still leave "[prefix] Playground" generic
+GENERIC_PREFIXES = frozenset({'the', 'local', 'community', 'public', 'new', 'old'})
+
+# Nominatim usage policy allows at most one request per second
+NOMINATIM_RATE = 1.0
+NOMINATIM_TIMEOUT = 15
+GEOCODE_WORKERS = 8
+GEO_CACHE_FILE = 'geo_cache.sqlite'
+
+# Only every Nth reverse geocoding failure is logged while Nominatim is degraded
+GEOCODE_ERROR_LOG_EVERY = 100
+
+# Entries handed to a row-building worker per task
+ROW_BUILD_CHUNKSIZE = 64
+
+# Migrator copy used by row-building worker processes
+_worker_migrator = None
+
+def _init_row_worker(migrator):
+    """Pool initializer: keep the (connection-free) migrator for this worker"""
+    global _worker_migrator
+    _worker_migrator = migrator
+
+def _build_row_in_worker(item):
+    """Build one UNWIND row from an (entry, geocoded_street, digest) triple"""
+    return _worker_migrator._build_row(*item)
+
+# Entry fields left out of the content hash: directory_processor stamps
+# additional_info.last_updated on every build, and id is the row position
+VOLATILE_ENTRY_FIELDS = ('id',)
+VOLATILE_ADDITIONAL_INFO_FIELDS = ('last_updated',)
+
+def content_hash(entry: Dict) -> str:
+    """Stable digest of an entry's content, stored on its Playground node"""
+    stable = {k: v for k, v in entry.items() if k not in VOLATILE_ENTRY_FIELDS}
+    if isinstance(stable.get('additional_info'), dict):
+        stable['additional_info'] = {
+            k: v for k, v in stable['additional_info'].items() if k not in VOLATILE_ADDITIONAL_INFO_FIELDS
+        }
+    canonical = json.dumps(stable, sort_keys=True, separators=(',', ':'))
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
 
 class PlaygroundNeo4jMigrator:
-    def __init__(self, uri: str, username: str, password: str, json_file: str):
-        """Initialize the migrator"""
-        self.driver = GraphDatabase.driver(uri, auth=(username, password))
+    def __init__(self, uri: str, username: str, password: str, json_file: str,
+                 incremental: bool = False, fresh: bool = False):
+        """Initialize the migrator; fresh runs clear migrated nodes first, incremental ones skip unchanged entries"""
+        if incremental and fresh:
+            raise ValueError("incremental and fresh migrations cannot be combined")
+        self.uri = uri
+        self.auth = (username, password)
+        self.driver = GraphDatabase.driver(uri, auth=self.auth)
         self.json_file = json_file
+        self.incremental = incremental
+        self.fresh = fresh
+        self.batch_query = migrate_batch_query(cleanup=not fresh)
         self.logger = logging.getLogger(__name__)
         
+        # Reverse geocoding: shared HTTP session, rate limit and results cache
+        self.http = requests.Session()
+        # One kept-alive connection per geocoding worker thread
+        self.http.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=GEOCODE_WORKERS))
+        self.http.headers['User-Agent'] = 'PlaygroundDirectory/1.0'
+        self.rate_limiter = RateLimiter(NOMINATIM_RATE)
+        self._geo_cache: Dict[Tuple[float, float], str] = {}
+        self._geo_err_count = 0
+        self._geo_err_lock = threading.Lock()
+        
+        # Process pool for row building, set while migrate_all runs
+        self.pool = None
+        
+        # Results persist across runs so reruns do not hit Nominatim again.
+        # Rows are prepared in a worker thread (one batch at a time), so the
+        # connection must not be pinned to the creating thread.
+        self._geo_db = sqlite3.connect(GEO_CACHE_FILE, check_same_thread=False)
+        self._geo_db.execute(
+            "CREATE TABLE IF NOT EXISTS geo (lat REAL, lon REAL, street TEXT, PRIMARY KEY (lat, lon))"
+        )
+        
     def close(self):
-        """Close the Neo4j connection"""
+        """Close the Neo4j connection and the geocode cache"""
         self.driver.close()
+        self._geo_db.commit()
+        self._geo_db.close()
         
-    def load_json_data(self) -> Dict:
-        """Load data from JSON file"""
-        with open(self.json_file, 'r') as f:
-            return json.load(f)
+    def iter_entries(self) -> Iterator[Dict]:
+        """Stream directory entries from the JSON file one at a time"""
+        with open(self.json_file, 'rb') as f:
+            yield from ijson.items(f, 'entries.item', use_float=True)
+            
+    def count_entries(self) -> Optional[int]:
+        """Read total_entries from the metadata header without parsing the entries"""
+        with open(self.json_file, 'rb') as f:
+            return next(ijson.items(f, 'metadata.total_entries'), None)
             
     def get_location_from_name(self, name: str) -> str:
         """Extract location information from the playground name"""
-        # Common location indicators that might appear in names
-        location_indicators = ['street', 'road', 'avenue', 'lane', 'way', 'close', 'drive', 
-                             'grove', 'gardens', 'park', 'square', 'hill', 'place', 'terrace',
-                             'court', 'crescent', 'boulevard', 'row', 'walk', 'alley']
-        
-        name_parts = name.lower().split()
-        for i, word in enumerate(name_parts):
-            if word in location_indicators and i > 0:
+        name_lower = name.lower()
+        for end, word in STREET_AUTOMATON.iter(name_lower):
+            start = end - len(word) + 1
+            # Only whole words count as indicators
+            if start > 0 and not name_lower[start - 1].isspace():
+                continue
+            if end + 1 < len(name_lower) and not name_lower[end + 1].isspace():
+                continue
+            preceding = name_lower[:start].split()
+            if preceding:
                 # Return the word before the indicator plus the indicator
-                return f"{name_parts[i-1].title()} {word.title()}"
+                return f"{preceding[-1].title()} {word.title()}"
         return ""
 
-    def get_street_from_coordinates(self, lat: float, lon: float) -> str:
-        """Use Nominatim to get street name from coordinates"""
+    def geocode_key(self, lat: float, lon: float) -> Tuple[float, float]:
+        """Cache key for a coordinate pair (~1m precision)"""
+        return (round(lat, 5), round(lon, 5))
+        
+    def fetch_street_from_coordinates(self, lat: float, lon: float) -> Optional[str]:
+        """Reverse geocode via Nominatim under the shared rate limit; None if the request fails"""
         try:
             # Be nice to the Nominatim API
-            sleep(1)
+            self.rate_limiter.acquire()
             
             url = f"https://nominatim.openstreetmap.org/reverse?lat={lat}&lon={lon}&format=json"
-            headers = {
-                'User-Agent': 'PlaygroundDirectory/1.0'
-            }
-            
-            response = requests.get(url, headers=headers)
+            response = self.http.get(url, timeout=NOMINATIM_TIMEOUT)
             if response.status_code == 200:
                 data = response.json()
                 
@@ -65,36 +330,97 @@ class PlaygroundNeo4jMigrator:
                         if field in addr:
                             return f"{addr[field]} Area"
                             
-            return ""
+                return ""
+            return None
         except Exception as e:
-            self.logger.warning(f"Error in reverse geocoding: {str(e)}")
-            return ""
+            with self._geo_err_lock:
+                self._geo_err_count += 1
+                count = self._geo_err_count
+            if count % GEOCODE_ERROR_LOG_EVERY == 1:
+                self.logger.warning("Reverse geocoding errors: %d, last: %s", count, e)
+            return None
             
-    def get_street_name(self, address: str, city: str, lat: float = None, lon: float = None) -> str:
-        """Extract or generate a street name from address or nearby location"""
+    def load_cached_street(self, key: Tuple[float, float]) -> Optional[str]:
+        """Look a coordinate key up in memory, then in the on-disk cache"""
+        if key in self._geo_cache:
+            return self._geo_cache[key]
+        row = self._geo_db.execute("SELECT street FROM geo WHERE lat = ? AND lon = ?", key).fetchone()
+        if row is not None:
+            self._geo_cache[key] = row[0]
+            return row[0]
+        return None
+        
+    def store_street(self, key: Tuple[float, float], street: Optional[str]):
+        """Cache a lookup result; failed lookups are kept for this run only"""
+        self._geo_cache[key] = street or ""
+        if street is not None:
+            self._geo_db.execute("INSERT OR REPLACE INTO geo (lat, lon, street) VALUES (?, ?, ?)", (*key, street))
+            
+    def get_street_from_coordinates(self, lat: float, lon: float) -> str:
+        """Street name for coordinates, from the geocode cache when available"""
+        key = self.geocode_key(lat, lon)
+        street = self.load_cached_street(key)
+        if street is None:
+            self.store_street(key, self.fetch_street_from_coordinates(lat, lon))
+            self._geo_db.commit()
+            street = self._geo_cache[key]
+        return street
+        
+    def needs_geocoding(self, entry: Dict) -> bool:
+        """Whether cleaning this entry's name will fall back to reverse geocoding"""
+        lat = entry["location"]["coordinates"]["latitude"]
+        lon = entry["location"]["coordinates"]["longitude"]
+        if lat is None or lon is None or not self.is_generic_name(entry["name"]):
+            return False
+        address = entry["location"]["address"] or ""
+        return not self.get_street_from_address(address, entry["location"]["city"])
+        
+    def geocode_all(self, entries: List[Dict]):
+        """Pre-fill the geocode cache for every entry that needs it, concurrently"""
+        pending = set()
+        for entry in entries:
+            if self.needs_geocoding(entry):
+                coordinates = entry["location"]["coordinates"]
+                key = self.geocode_key(coordinates["latitude"], coordinates["longitude"])
+                if self.load_cached_street(key) is None:
+                    pending.add(key)
+        if not pending:
+            return
+            
+        with ThreadPoolExecutor(max_workers=GEOCODE_WORKERS) as executor:
+            futures = {executor.submit(self.fetch_street_from_coordinates, *key): key for key in pending}
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Reverse geocoding", leave=False):
+                self.store_street(futures[future], future.result())
+        self._geo_db.commit()
+                
+    def get_street_from_address(self, address: str, city: str) -> str:
+        """Pick the street part of an address, or '' if there is none"""
         if address:
             # Split address and process each part
             parts = [p.strip() for p in address.split(',')]
             
-            # Look for street indicators
-            street_indicators = ['street', 'road', 'avenue', 'lane', 'way', 'close', 'drive', 
-                               'grove', 'gardens', 'park', 'square', 'hill', 'place', 'terrace',
-                               'court', 'crescent', 'boulevard', 'row', 'walk', 'alley']
-            
             # First try to find a part containing a street indicator
             for part in parts:
-                part_lower = part.lower()
-                if any(indicator in part_lower for indicator in street_indicators):
+                if next(STREET_AUTOMATON.iter(part.lower()), None):
                     return part.strip()
             
             # If no street indicator found, use the first non-empty part that's not just the city name
             for part in parts:
                 if part and part.lower() != city.lower():
                     return part.strip()
+        return ""
+        
+    def get_street_name(self, address: str, city: str, lat: float = None, lon: float = None,
+                        geocoded_street: str = None) -> str:
+        """Extract or generate a street name from address or nearby location"""
+        street = self.get_street_from_address(address, city)
+        if street:
+            return street
         
         # If no address or no suitable part found, try reverse geocoding
+        # (unless the caller already resolved the coordinates)
         if lat is not None and lon is not None:
-            street = self.get_street_from_coordinates(lat, lon)
+            street = geocoded_street if geocoded_street is not None else self.get_street_from_coordinates(lat, lon)
             if street:
                 return street
                 
@@ -103,42 +429,26 @@ class PlaygroundNeo4jMigrator:
         
     def is_generic_name(self, name: str) -> bool:
         """Determine if a playground name is generic and needs location context"""
-        # Strictly generic names that don't include location information
-        generic_names = {
-            'playground',
-            'play area',
-            "children's playground",
-            'kids playground',
-            'play park',
-            'playpark',
-            'kids playzone',
-            'play ground',
-            'childrens playground',
-            'kids play area',
-            'play space',
-            'playspace'
-        }
-        
         name_lower = name.lower().strip()
         
         # If the name is exactly one of our generic names
-        if name_lower in generic_names:
+        if name_lower in GENERIC_NAMES:
             return True
             
         # If it's just "[Something] Playground" where Something is very generic
         if name_lower.endswith('playground'):
             prefix = name_lower.replace('playground', '').strip()
-            generic_prefixes = {'the', 'local', 'community', 'public', 'new', 'old'}
-            if prefix in generic_prefixes:
+            if prefix in GENERIC_PREFIXES:
                 return True
                 
         return False
         
-    def clean_playground_name(self, name: str, address: str, city: str, lat: float = None, lon: float = None) -> str:
+    def clean_playground_name(self, name: str, address: str, city: str, lat: float = None, lon: float = None,
+                              geocoded_street: str = None) -> str:
         """Clean generic playground names by adding location context"""
         if self.is_generic_name(name):
             # First try to get location from address or coordinates
-            street = self.get_street_name(address, city, lat, lon)
+            street = self.get_street_name(address, city, lat, lon, geocoded_street)
             
             # If no proper street name found, try to extract from original name
             if street.startswith('Unknown'):
@@ -153,117 +463,142 @@ class PlaygroundNeo4jMigrator:
     def generate_friendly_description(self, entry: Dict) -> str:
         """Generate a varied, matter-of-fact description for a playground"""
         features = entry["features"]
-        equipment = features["equipment_categories"]
-        amenities = features["amenities"]
         ratings = entry["ratings"]
         
+        # Look every amenity up once
+        get_amenity = features["amenities"].get
+        seating = get_amenity("seating")
+        shade = get_amenity("shade")
+        toilets = get_amenity("toilets")
+        cafe = get_amenity("cafe")
+        parking = get_amenity("parking")
+        bike_parking = get_amenity("bike_parking")
+        fencing = get_amenity("fencing")
+        lighting = get_amenity("lighting")
+        cctv = get_amenity("cctv")
+        first_aid = get_amenity("first_aid")
+        # safety_surface moved from amenities to the safety block
+        safety_surface = entry.get("safety", {}).get("surface", get_amenity("safety_surface"))
+        
         # Build description components
         parts = []
+        add = parts.append
         
         # Start with different types of openings
-        avg_rating = ratings.get("average") if ratings.get("average") is not None else 0
-        equipment_list = [k.replace("_", " ") for k, v in equipment.items() if v]
+        avg_rating = ratings.get("average")
+        if avg_rating is None:
+            avg_rating = 0
+        equipment_list = [k.replace("_", " ") for k, v in features["equipment_categories"].items() if v]
         
         # Choose an opening based on the playground's key features
         if equipment_list:
             if len(equipment_list) == 1:
-                parts.append(f"A playground centered around its {equipment_list[0]} area")
+                opening = f"A playground centered around its {equipment_list[0]} area"
             elif len(equipment_list) == 2:
-                parts.append(f"{equipment_list[0].title()} and {equipment_list[1]} equipment form the core of this playground")
+                opening = f"{equipment_list[0].title()} and {equipment_list[1]} equipment form the core of this playground"
             else:
                 equipment_str = ", ".join(equipment_list[:-1]) + f", and {equipment_list[-1]}"
-                parts.append(f"A diverse playground offering {equipment_str}")
+                opening = f"A diverse playground offering {equipment_str}"
         elif avg_rating >= 4:
-            parts.append("A highly-rated playground in the local community")
-        elif amenities.get("fencing") and (amenities.get("seating") or amenities.get("shade")):
-            parts.append("A secure, family-friendly playground")
+            opening = "A highly-rated playground in the local community"
+        elif fencing and (seating or shade):
+            opening = "A secure, family-friendly playground"
         else:
-            parts.append("A neighborhood playground")
+            opening = "A neighborhood playground"
             
         # Add location if available
-        if entry["location"]["address"]:
-            parts[0] += f" located on {entry['location']['address']}"
-        parts[0] += "."
+        address = entry["location"]["address"]
+        add(f"{opening} located on {address}." if address else f"{opening}.")
         
         # Age range as a separate statement if specific
-        if features.get("age_range") and features["age_range"] != "all":
-            parts.append(f"Best suited for {features['age_range']}.")
+        age_range = features.get("age_range")
+        if age_range and age_range != "all":
+            add(f"Best suited for {age_range}.")
         
         # Amenities description with varied sentence structures
         amenity_desc = []
-        if amenities.get("seating") and amenities.get("shade"):
+        if seating and shade:
             amenity_desc.append("shaded seating areas")
-        elif amenities.get("seating"):
+        elif seating:
             amenity_desc.append("seating areas")
-        elif amenities.get("shade"):
+        elif shade:
             amenity_desc.append("shaded areas")
             
-        if amenities.get("toilets") and amenities.get("cafe"):
+        if toilets and cafe:
             amenity_desc.append("toilets and café")
-        elif amenities.get("toilets"):
+        elif toilets:
             amenity_desc.append("toilet facilities")
-        elif amenities.get("cafe"):
+        elif cafe:
             amenity_desc.append("café")
             
-        if amenities.get("parking") and amenities.get("bike_parking"):
+        if parking and bike_parking:
             amenity_desc.append("car and bike parking")
-        elif amenities.get("parking"):
+        elif parking:
             amenity_desc.append("parking")
-        elif amenities.get("bike_parking"):
+        elif bike_parking:
             amenity_desc.append("bike racks")
             
-        if amenities.get("fencing"):
+        if fencing:
             amenity_desc.append("secure fencing")
             
         if amenity_desc:
             # Vary the sentence structure based on the number and type of amenities
             if len(amenity_desc) == 1:
-                if "fencing" in amenity_desc[0]:
-                    parts.append(f"The area is enclosed with {amenity_desc[0]}.")
-                elif "parking" in amenity_desc[0]:
-                    parts.append(f"{amenity_desc[0].title()} available.")
+                only = amenity_desc[0]
+                if "fencing" in only:
+                    add(f"The area is enclosed with {only}.")
+                elif "parking" in only:
+                    add(f"{only.title()} available.")
                 else:
-                    parts.append(f"Includes {amenity_desc[0]}.")
+                    add(f"Includes {only}.")
             else:
                 amenities_str = ", ".join(amenity_desc[:-1]) + f", and {amenity_desc[-1]}"
-                parts.append(f"Facilities include {amenities_str}.")
+                add(f"Facilities include {amenities_str}.")
         
         # Safety features with varied descriptions
-        safety_desc = []
-        if amenities.get("safety_surface"):
-            safety_desc.append("safety surfacing")
-        if amenities.get("lighting"):
-            safety_desc.append("lighting")
-        if amenities.get("cctv"):
-            safety_desc.append("CCTV")
-        if amenities.get("first_aid"):
-            safety_desc.append("first aid station")
+        safety_desc = [
+            label for label, present in (
+                ("safety surfacing", safety_surface),
+                ("lighting", lighting),
+                ("CCTV", cctv),
+                ("first aid station", first_aid)
+            ) if present
+        ]
             
         if safety_desc:
             if len(safety_desc) == 1:
-                parts.append(f"Equipped with {safety_desc[0]}.")
+                add(f"Equipped with {safety_desc[0]}.")
             else:
-                safety_str = ", ".join(safety_desc)
-                parts.append(f"Safety features: {safety_str}.")
+                add(f"Safety features: {', '.join(safety_desc)}.")
         
         # Add rating information if significant
         if avg_rating > 0:
             stars = "★" * int(round(avg_rating))
             review_count = ratings.get("review_count", 0) or 0
             if review_count > 20:
-                parts.append(f"Popular with the community, rated {stars} across {review_count} reviews.")
+                add(f"Popular with the community, rated {stars} across {review_count} reviews.")
             elif review_count > 10:
-                parts.append(f"Rated {stars} based on {review_count} community reviews.")
+                add(f"Rated {stars} based on {review_count} community reviews.")
             elif avg_rating >= 4:
-                parts.append(f"Early visitors rate this playground {stars}.")
+                add(f"Early visitors rate this playground {stars}.")
         
         # Join all parts into a cohesive paragraph
-        description = " ".join(parts)
-            
-        return description
+        return " ".join(parts)
+        
+    def location_slug(self, entry: Dict) -> str:
+        """Location-aware slug with coordinates, unique per playground"""
+        lat = entry["location"]["coordinates"]["latitude"]
+        lon = entry["location"]["coordinates"]["longitude"]
+        coord_str = f"{lat:.6f}-{lon:.6f}".translate(COORD_SLUG_TRANS)
+        city_slug = slug_component(entry['location']['city'])
         
-    def migrate_playground(self, tx, entry: Dict):
-        """Migrate a single playground entry"""
+        postcode = entry['location']['postcode']
+        if postcode:
+            return f"{entry['slug']}-{city_slug}-{slug_component(postcode)}-{coord_str}"
+        return f"{entry['slug']}-{city_slug}-{coord_str}"
+        
+    def _build_row(self, entry: Dict, geocoded_street: str = None, digest: str = None) -> Dict:
+        """Build the UNWIND parameters for a single playground entry"""
         # Get the address and coordinates
         address = entry["location"]["address"] or ""
         lat = entry["location"]["coordinates"]["latitude"]
@@ -275,7 +610,8 @@ class PlaygroundNeo4jMigrator:
             address,
             entry["location"]["city"],
             lat,
-            lon
+            lon,
+            geocoded_street
         )
         
         # Generate friendly description
@@ -283,200 +619,304 @@ class PlaygroundNeo4jMigrator:
         
         # Create location-aware slug with coordinates
         base_slug = entry["slug"]
-        coord_str = f"{lat:.6f}-{lon:.6f}".replace(".", "p")  # Replace dots with 'p' for valid slug
-        
-        location_parts = [
-            base_slug,
-            entry['location']['city'].lower().replace(' ', '-'),
-        ]
-        
-        if entry['location']['postcode']:
-            location_parts.append(entry['location']['postcode'].lower().replace(' ', '-'))
-            
-        location_parts.append(coord_str)
-        location_slug = "-".join(location_parts)
-            
-        # Create playground node with composite key of name and location
-        playground_query = """
-        MERGE (p:Playground {
-            slug: $slug,
-            name: $name,
-            region: $region,
-            city: $city,
-            postcode: $postcode,
-            location: point({latitude: $latitude, longitude: $longitude}),
-            address: $address
-        })
-        SET p += {
-            description: $description,
-            age_range: $age_range,
-            avg_rating: $avg_rating,
-            review_count: $review_count,
-            popularity_score: $popularity_score,
-            last_updated: datetime($last_updated),
-            base_slug: $base_slug
-        }
-        RETURN elementId(p) as playground_id
-        """
+        location_slug = self.location_slug(entry)
         
         # Handle null ratings with defaults
         avg_rating = entry["ratings"]["average"] if entry["ratings"]["average"] is not None else 0.0
         review_count = entry["ratings"]["review_count"] if entry["ratings"]["review_count"] is not None else 0
         popularity_score = entry["ratings"]["popularity_score"] if entry["ratings"]["popularity_score"] is not None else 0.0
         
-        result = tx.run(
-            playground_query,
-            slug=location_slug,
-            base_slug=base_slug,
-            name=cleaned_name,
-            description=description,
-            region=entry["location"]["region"],
-            address=address,
-            city=entry["location"]["city"],
-            postcode=entry["location"]["postcode"],
-            latitude=lat,
-            longitude=lon,
-            age_range=entry["features"]["age_range"] or "all",
-            avg_rating=avg_rating,
-            review_count=review_count,
-            popularity_score=popularity_score,
-            last_updated=entry["additional_info"]["last_updated"]
-        )
+        # Equipment relationships (from equipment_categories)
+        equipment = [
+            {"type": equip_type, "has_equipment": has_equip}
+            for equip_type, has_equip in entry["features"]["equipment_categories"].items()
+        ]
         
-        playground_id = result.single()["playground_id"]
-        
-        # First, remove any existing relationships and related nodes
-        cleanup_query = """
-        MATCH (p:Playground)-[r]->(n)
-        WHERE elementId(p) = $playground_id
-        DETACH DELETE n
-        """
-        tx.run(cleanup_query, playground_id=playground_id)
-        
-        # Create equipment relationships (from equipment_categories)
-        equipment_query = """
-        MATCH (p:Playground) WHERE elementId(p) = $playground_id
-        MERGE (et:Value {name: $type, category: 'EquipmentType'})
-        CREATE (e:Equipment {has_equipment: $has_equipment})
-        CREATE (p)-[:HAS_EQUIPMENT]->(e)-[:IS_TYPE]->(et)
-        """
-        
-        for equip_type, has_equip in entry["features"]["equipment_categories"].items():
-            tx.run(equipment_query,
-                playground_id=playground_id,
-                type=equip_type,
-                has_equipment=has_equip
-            )
-            
-        # Create amenities node (from amenities, excluding equipment fields)
-        equipment_fields = {'climbing', 'swings', 'slides', 'activity', 'sports', 'water', 'sensory', 'safety_surface'}
-        amenities = {
-            f"has_{k}": v 
-            for k, v in entry["features"]["amenities"].items() 
-            if k not in equipment_fields
-        }
+        # Amenity flags (from amenities, excluding equipment and safety fields)
+        entry_amenities = entry["features"]["amenities"]
+        amenities = {f"has_{k}": entry_amenities.get(k, False) for k in AMENITY_FIELDS}
         
-        amenities_query = """
-        MATCH (p:Playground) WHERE elementId(p) = $playground_id
-        CREATE (a:Amenities {
-            has_parking: $has_parking,
-            has_toilets: $has_toilets,
-            has_cafe: $has_cafe,
-            has_seating: $has_seating,
-            has_shade: $has_shade,
-            has_fencing: $has_fencing,
-            has_accessibility: $has_accessibility,
-            has_bike_parking: $has_bike_parking
-        })
-        CREATE (p)-[:HAS_AMENITIES]->(a)
-        """
-        
-        tx.run(amenities_query,
-            playground_id=playground_id,
-            **amenities
+        # Safety flags; safety_surface lives under "safety" in
+        # current directory files and under amenities in older ones
+        safety_features = {f"has_{k}": entry_amenities.get(k, False) for k in SAFETY_FIELDS}
+        safety_features["has_safety_surface"] = entry.get("safety", {}).get(
+            "surface", entry_amenities.get("safety_surface", False)
         )
         
-        # Create safety features node
-        safety_fields = {'lighting', 'cctv', 'first_aid'}
-        safety_features = {
-            f"has_{k}": entry["features"]["amenities"].get(k, False)
-            for k in safety_fields
+        # Only create reviews with actual content
+        reviews = [
+            {
+                "title": review_data.get("title"),
+                "text": review_data.get("text"),
+                "rating": review_data.get("rating"),
+                "date": review_data.get("date"),
+                "source": review_data.get("source")
+            }
+            for review_data in entry["ratings"]["reviews"] or []
+            if review_data.get("text")
+        ]
+        
+        tags = [
+            {"value": tag_value, "category": category.replace("_tags", "")}
+            for category, tag_list in entry["metadata"].items()
+            for tag_value in tag_list
+        ]
+        
+        return {
+            "slug": location_slug,
+            "name": cleaned_name,
+            "region": entry["location"]["region"],
+            "city": entry["location"]["city"],
+            "postcode": entry["location"]["postcode"],
+            "latitude": lat,
+            "longitude": lon,
+            "address": address,
+            "props": {
+                "description": description,
+                "age_range": entry["features"]["age_range"] or "all",
+                "avg_rating": avg_rating,
+                "review_count": review_count,
+                "popularity_score": popularity_score,
+                "base_slug": base_slug,
+                "content_hash": digest or content_hash(entry)
+            },
+            "last_updated": entry["additional_info"]["last_updated"],
+            "equipment": equipment,
+            "amenities": amenities,
+            "safety": safety_features,
+            "reviews": reviews,
+            "tags": tags
         }
-        safety_features["has_safety_surface"] = entry["features"]["amenities"].get("safety_surface", False)
-        
-        safety_query = """
-        MATCH (p:Playground) WHERE elementId(p) = $playground_id
-        CREATE (s:Safety {
-            has_safety_surface: $has_safety_surface,
-            has_lighting: $has_lighting,
-            has_cctv: $has_cctv,
-            has_first_aid: $has_first_aid
-        })
-        CREATE (p)-[:HAS_SAFETY_FEATURES]->(s)
-        """
-        
-        tx.run(safety_query,
-            playground_id=playground_id,
-            **safety_features
-        )
         
-        # Create reviews
-        if entry["ratings"]["reviews"]:
-            review_query = """
-            MATCH (p:Playground) WHERE elementId(p) = $playground_id
-            CREATE (r:Review {
-                title: $title,
-                text: $text,
-                rating: $rating,
-                date: datetime($date),
-                source: $source
-            })
-            CREATE (p)-[:HAS_REVIEW]->(r)
-            """
+    def __getstate__(self):
+        """Pickle without connections, locks or the pool, for worker processes"""
+        state = self.__dict__.copy()
+        for key in ('driver', 'http', 'rate_limiter', '_geo_db', '_geo_err_lock', 'pool'):
+            state.pop(key, None)
+        return state
+        
+    def skip_unchanged(self, batch: List[Dict]) -> List[Tuple[Dict, str]]:
+        """Pair entries with their content hash, dropping those already stored unchanged"""
+        hashed = [(entry, content_hash(entry)) for entry in batch]
+        if not self.incremental:
+            return hashed
             
-            for review_data in entry["ratings"]["reviews"]:
-                if review_data.get("text"):  # Only create reviews with actual content
-                    tx.run(review_query,
-                        playground_id=playground_id,
-                        **review_data
-                    )
+        slugs = [self.location_slug(entry) for entry in batch]
+        with self.driver.session() as session:
+            stored = {
+                record["slug"]: record["content_hash"]
+                for record in session.run(STORED_HASHES_QUERY, slugs=slugs)
+            }
+        return [(entry, digest) for slug, (entry, digest) in zip(slugs, hashed) if stored.get(slug) != digest]
+        
+    def prepare_rows(self, batch: List[Dict]) -> List[Dict]:
+        """Geocode a batch of entries and build UNWIND rows for those that changed"""
+        hashed = self.skip_unchanged(batch)
+        self.geocode_all([entry for entry, _ in hashed])
+        
+        # Workers cannot reach the geocode cache, so hand each entry the
+        # street already resolved for it in this process
+        items = []
+        for entry, digest in hashed:
+            street = None
+            if self.needs_geocoding(entry):
+                coordinates = entry["location"]["coordinates"]
+                street = self.get_street_from_coordinates(coordinates["latitude"], coordinates["longitude"])
+            items.append((entry, street, digest))
             
-        # Create tags
-        tag_query = """
-        MATCH (p:Playground) WHERE elementId(p) = $playground_id
-        MERGE (t:Tag {value: $tag, category: $category})
-        CREATE (p)-[:TAGGED_WITH]->(t)
-        """
-        
-        for category, tag_list in entry["metadata"].items():
-            category = category.replace("_tags", "")
-            for tag_value in tag_list:
-                tx.run(tag_query,
-                    playground_id=playground_id,
-                    tag=tag_value,
-                    category=category
-                )
+        if self.pool is None:
+            return [self._build_row(*item) for item in items]
+        return self.pool.map(_build_row_in_worker, items, chunksize=ROW_BUILD_CHUNKSIZE)
+        
+    async def write_rows(self, driver, rows: List[Dict]):
+        """Write rows in one managed transaction, MIGRATION_BATCH_SIZE rows per statement"""
+        # Slice before entering the transaction function so retries only
+        # repeat the network writes
+        chunks = [rows[start:start + MIGRATION_BATCH_SIZE] for start in range(0, len(rows), MIGRATION_BATCH_SIZE)]
+        
+        async def work(tx):
+            for chunk in chunks:
+                result = await tx.run(self.batch_query, rows=chunk)
+                await result.consume()
                 
-    def migrate_all(self):
+        async with driver.session() as session:
+            await session.execute_write(work)
+            
+    def clear_database(self):
+        """Delete the nodes this migrator writes before a fresh migration"""
+        self.logger.info("Clearing existing data...")
+        with self.driver.session() as session:
+            session.run(CLEAR_DATABASE_QUERY).consume()
+            
+    def create_indexes(self):
+        """Create the constraints and indexes used by the migration MERGEs"""
+        with self.driver.session() as session:
+            for query in SCHEMA_QUERIES:
+                session.run(query).consume()
+            session.run("CALL db.awaitIndexes()").consume()
+            
+    async def migrate_all(self):
         """Migrate all playground data to Neo4j"""
-        data = self.load_json_data()
-        total = len(data["entries"])
+        # A fresh migration starts from a cleared graph, so the batch query
+        # has nothing to clean up per playground
+        if self.fresh:
+            self.clear_database()
+        self.create_indexes()
+        total = self.count_entries()
+        entries = self.iter_entries()
         
         print(f"Starting migration of {total} playgrounds...")
         
-        with self.driver.session() as session:
-            for entry in tqdm(data["entries"], desc="Migrating playgrounds"):
-                try:
-                    session.execute_write(self.migrate_playground, entry)
-                except Exception as e:
-                    self.logger.error(f"Error migrating playground {entry.get('name', 'Unknown')}: {str(e)}")
-                    raise
+        # Up to MIGRATION_CONCURRENCY transactions of MIGRATION_COMMIT_SIZE
+        # entries are in flight at once, each on its own session; the next
+        # batch is prepared off the event loop while they run
+        in_flight = asyncio.Semaphore(MIGRATION_CONCURRENCY)
+        
+        # Row building (name cleaning, descriptions, slugs) is CPU-bound and
+        # runs across all cores
+        with mp.Pool(processes=os.cpu_count(), initializer=_init_row_worker, initargs=(self,)) as pool:
+            self.pool = pool
+            try:
+                async with AsyncGraphDatabase.driver(self.uri, auth=self.auth) as driver:
+                    with tqdm(total=total, desc="Migrating playgrounds") as progress:
+                        async def write(start: int, batch: List[Dict], rows: List[Dict]):
+                            try:
+                                await self.write_rows(driver, rows)
+                            except Exception as e:
+                                self.logger.error(
+                                    "Error migrating playgrounds %d-%d (starting with %s): %s",
+                                    start, start + len(batch) - 1, batch[0].get('name', 'Unknown'), e
+                                )
+                                raise
+                            finally:
+                                in_flight.release()
+                            progress.update(len(batch))
+                            
+                        tasks = []
+                        
+                        def raise_failures():
+                            """Drop finished writes, re-raising the first one that failed"""
+                            for task in [task for task in tasks if task.done()]:
+                                tasks.remove(task)
+                                task.result()
+                                
+                        start = 0
+                        try:
+                            while batch := list(islice(entries, MIGRATION_COMMIT_SIZE)):
+                                raise_failures()
+                                rows = await asyncio.to_thread(self.prepare_rows, batch)
+                                if not rows:
+                                    # Every entry in the batch is already up to date
+                                    progress.update(len(batch))
+                                    start += len(batch)
+                                    continue
+                                await in_flight.acquire()
+                                raise_failures()
+                                tasks.append(asyncio.create_task(write(start, batch, rows)))
+                                start += len(batch)
+                            await asyncio.gather(*tasks)
+                        except BaseException:
+                            # Stop on the first failed write instead of
+                            # submitting the rest of the file
+                            for task in tasks:
+                                task.cancel()
+                            await asyncio.gather(*tasks, return_exceptions=True)
+                            raise
+            finally:
+                self.pool = None
                 
         print("\nMigration completed successfully!")
         
         # Print summary
         self._print_summary()
         
+    def write_bulk_rows(self, writers: Dict, row: Dict, tags: set, equipment_types: set):
+        """Write one playground row and its related nodes to the bulk import CSVs"""
+        slug = row["slug"]
+        props = row["props"]
+        writers["Playground"].writerow([
+            slug, row["name"], row["region"], row["city"], row["postcode"], row["address"],
+            f"{{latitude:{row['latitude']}, longitude:{row['longitude']}}}",
+            props["description"], props["age_range"], props["avg_rating"], props["review_count"],
+            props["popularity_score"], props["base_slug"], props["content_hash"], row["last_updated"],
+            *(row["amenities"][f"has_{k}"] for k in AMENITY_FIELDS),
+            row["safety"]["has_safety_surface"], *(row["safety"][f"has_{k}"] for k in SAFETY_FIELDS)
+        ])
+        
+        for equipment in row["equipment"]:
+            equipment_id = f"{slug}:{equipment['type']}"
+            writers["Equipment"].writerow([equipment_id, equipment["has_equipment"]])
+            writers["HAS_EQUIPMENT"].writerow([slug, equipment_id])
+            writers["IS_TYPE"].writerow([equipment_id, equipment["type"]])
+            equipment_types.add(equipment["type"])
+            
+        for i, review in enumerate(row["reviews"]):
+            review_id = f"{slug}:{i}"
+            writers["Review"].writerow([
+                review_id, review["title"], review["text"], review["rating"], review["date"], review["source"]
+            ])
+            writers["HAS_REVIEW"].writerow([slug, review_id])
+            
+        for tag in row["tags"]:
+            tag_id = f"{tag['category']}:{tag['value']}"
+            tags.add((tag_id, tag["value"], tag["category"]))
+            writers["TAGGED_WITH"].writerow([slug, tag_id])
+            
+    def export_csvs(self, outdir: str) -> List[str]:
+        """Write neo4j-admin import CSVs for every entry and return the import command"""
+        os.makedirs(outdir, exist_ok=True)
+        layout = {**BULK_NODE_FILES, **BULK_RELATIONSHIP_FILES}
+        files = {
+            key: open(os.path.join(outdir, filename), 'w', newline='', encoding='utf-8')
+            for key, (filename, _) in layout.items()
+        }
+        try:
+            writers = {}
+            for key, (_, header) in layout.items():
+                writers[key] = csv.writer(files[key])
+                writers[key].writerow(header)
+                
+            # Tag and equipment type nodes are shared, so they are written
+            # once at the end
+            tags = set()
+            equipment_types = set()
+            entries = self.iter_entries()
+            with mp.Pool(processes=os.cpu_count(), initializer=_init_row_worker, initargs=(self,)) as pool:
+                self.pool = pool
+                try:
+                    with tqdm(total=self.count_entries(), desc="Writing import CSVs") as progress:
+                        while batch := list(islice(entries, MIGRATION_COMMIT_SIZE)):
+                            for row in self.prepare_rows(batch):
+                                self.write_bulk_rows(writers, row, tags, equipment_types)
+                            progress.update(len(batch))
+                finally:
+                    self.pool = None
+                    
+            writers["Tag"].writerows(sorted(tags))
+            writers["Value"].writerows([equipment_type, 'EquipmentType'] for equipment_type in sorted(equipment_types))
+        finally:
+            for f in files.values():
+                f.close()
+                
+        return [
+            "neo4j-admin", "database", "import", "full",
+            "--overwrite-destination", "--skip-duplicate-nodes", "--multiline-fields=true",
+            *(f"--nodes={label}={os.path.join(outdir, filename)}" for label, (filename, _) in BULK_NODE_FILES.items()),
+            *(f"--relationships={rel_type}={os.path.join(outdir, filename)}"
+              for rel_type, (filename, _) in BULK_RELATIONSHIP_FILES.items()),
+            "neo4j"
+        ]
+        
+    def bulk_import(self, outdir: str = BULK_IMPORT_DIR):
+        """Greenfield load via neo4j-admin; the target database must be stopped"""
+        command = self.export_csvs(outdir)
+        if shutil.which(command[0]) is None:
+            print(f"neo4j-admin not found; run this on the database host:\n{shlex.join(command)}")
+            return
+        self.logger.info("Running %s", shlex.join(command))
+        subprocess.run(command, check=True)
+        print("\nBulk import completed successfully!")
+        
     def _print_summary(self):
         """Print migration summary"""
         summary_queries = {
@@ -507,6 +947,16 @@ class PlaygroundNeo4jMigrator:
                     
 def main():
     """Main function to run the migration"""
+    parser = argparse.ArgumentParser(description="Migrate the playground directory to Neo4j")
+    parser.add_argument("--bulk", action="store_true",
+                        help="write neo4j-admin import CSVs and run an offline full import")
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument("--incremental", action="store_true",
+                       help="skip playgrounds unchanged since the last migration")
+    modes.add_argument("--fresh", action="store_true",
+                       help="delete all previously migrated nodes before migrating")
+    args = parser.parse_args()
+    
     # Configure logging
     logging.basicConfig(
         level=logging.INFO,
@@ -520,8 +970,12 @@ def main():
     json_file = "playground_directory.json"
     
     try:
-        migrator = PlaygroundNeo4jMigrator(uri, username, password, json_file)
-        migrator.migrate_all()
+        migrator = PlaygroundNeo4jMigrator(uri, username, password, json_file,
+                                           incremental=args.incremental, fresh=args.fresh)
+        if args.bulk:
+            migrator.bulk_import()
+        else:
+            asyncio.run(migrator.migrate_all())
         migrator.close()
     except Exception as e:
         print(f"Error during migration: {str(e)}")
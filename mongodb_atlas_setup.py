@@ -1,12 +1,15 @@
 from pymongo import MongoClient
-import json
-from datetime import datetime
+import ijson
+from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Documents sent per insert_many call
+INSERT_BATCH_SIZE = 1000
+
 def connect_to_mongodb():
     """Connect to MongoDB Atlas"""
     try:
@@ -20,7 +23,7 @@ def connect_to_mongodb():
             return None
             
         # Connect to MongoDB Atlas
-        client = MongoClient(connection_string)
+        client = MongoClient(connection_string, maxPoolSize=50, w=1)
         
         # Create/access the playground database
         db = client['playground_db']
@@ -36,34 +39,45 @@ def connect_to_mongodb():
 def import_playground_data(db, file_path, collection_name):
     """Import playground data from JSON file into MongoDB"""
     try:
-        # Read JSON file
-        with open(file_path, 'r') as file:
-            playgrounds = json.load(file)
-        
         # Get the collection
         collection = db[collection_name]
         
         # Drop existing collection to avoid duplicates
         collection.drop()
         
-        # Add metadata to each playground
-        for playground in playgrounds:
-            playground['imported_at'] = datetime.now()
-            
-            # Convert coordinates to GeoJSON format for better geospatial queries
-            if 'latitude' in playground and 'longitude' in playground:
-                playground['location'] = {
-                    'type': 'Point',
-                    'coordinates': [playground['longitude'], playground['latitude']]
-                }
+        # One import timestamp for the whole run
+        imported_at = datetime.now(timezone.utc)
+        inserted = 0
+        batch = []
         
-        # Insert the data
-        result = collection.insert_many(playgrounds)
+        # Stream the JSON array and insert in fixed-size batches so only one
+        # batch of documents is held in memory at a time
+        with open(file_path, 'rb') as file:
+            for playground in ijson.items(file, 'item', use_float=True):
+                # Add metadata to each playground
+                playground['imported_at'] = imported_at
+                
+                # Convert coordinates to GeoJSON format for better geospatial queries
+                if 'latitude' in playground and 'longitude' in playground:
+                    playground['location'] = {
+                        'type': 'Point',
+                        'coordinates': [playground['longitude'], playground['latitude']]
+                    }
+                    
+                batch.append(playground)
+                if len(batch) >= INSERT_BATCH_SIZE:
+                    # Unordered so the server can apply the batch without
+                    # stopping at the first failed document
+                    inserted += len(collection.insert_many(batch, ordered=False).inserted_ids)
+                    batch = []
+                    
+        if batch:
+            inserted += len(collection.insert_many(batch, ordered=False).inserted_ids)
         
         # Create geospatial index
         collection.create_index([('location', '2dsphere')])
         
-        print(f"Successfully imported {len(result.inserted_ids)} playgrounds into {collection_name}")
+        print(f"Successfully imported {inserted} playgrounds into {collection_name}")
         return True
     except Exception as e:
         print(f"Error importing data: {e}")
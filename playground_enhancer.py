@@ -1,47 +1,96 @@
+import asyncio
+import aiohttp
+import csv
+from datetime import datetime
+import diskcache
+import hashlib
 import pandas as pd
-import googlemaps
+from tqdm import tqdm
 import os
 from dotenv import load_dotenv
 import logging
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, Optional, Tuple
 from pathlib import Path
+from rate_limiter import AsyncRateLimiter
 
 # Load environment variables
 load_dotenv()
 logger = logging.getLogger(__name__)
 
-# Check .env loading
-env_file = Path('.env')
-if env_file.exists():
-    logger.info(f".env file found at {env_file.absolute()}")
-else:
-    logger.error(f".env file not found at {env_file.absolute()}")
+def _setup_logging():
+    """Configure logging for a command-line run"""
+    logging.basicConfig(
+        level=os.getenv('LOG_LEVEL', 'INFO'),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('playground_enhancer.log'),
+            logging.StreamHandler()
+        ]
+    )
+    
+    # Check .env loading
+    env_file = Path('.env')
+    if env_file.exists():
+        logger.info(".env file found at %s", env_file.absolute())
+    else:
+        logger.error(".env file not found at %s", env_file.absolute())
 
-# Configure logging
-logging.basicConfig(
-    level=os.getenv('LOG_LEVEL', 'INFO'),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('playground_enhancer.log'),
-        logging.StreamHandler()
-    ]
-)
+# Google Places REST endpoints, called directly so lookups can run concurrently
+PLACES_TEXT_SEARCH_URL = 'https://maps.googleapis.com/maps/api/place/textsearch/json'
+PLACE_DETAILS_URL = 'https://maps.googleapis.com/maps/api/place/details/json'
+
+# Playgrounds in flight at once. This only bounds open requests; the
+# request rate is capped separately by PLACES_QPS.
+PLACES_CONCURRENCY = 100
+PLACES_CONNECTIONS_PER_HOST = 64
+
+# Places API request budget, and retries for throttled or unavailable responses
+PLACES_QPS = 50
+PLACES_MAX_RETRIES = 5
+RETRYABLE_STATUS_CODES = (429, 503)
+
+# Place Details fields that end up in the enhanced data. Reviews are fetched
+# by PlaygroundReviewSummarizer; photos are only requested on demand.
+PLACE_DETAILS_FIELDS = [
+    'name', 'formatted_address', 'geometry/location', 'rating',
+    'user_ratings_total', 'opening_hours', 'formatted_phone_number',
+    'website', 'wheelchair_accessible_entrance'
+]
+
+# Output columns, in order; failed lookups only fill the original_* columns and error
+ENHANCED_FIELDS = [
+    'original_name', 'original_location', 'original_postcode', 'google_place_id',
+    'name', 'address', 'latitude', 'longitude', 'rating', 'total_ratings', 'phone',
+    'website', 'wheelchair_accessible', 'opening_hours', 'photos_available',
+    'last_updated', 'error'
+]
+
+# Resolved playgrounds are reused across runs for 30 days
+PLACES_CACHE_DIR = '.places_cache'
+PLACES_CACHE_TTL = 30 * 86400
 
 class PlaygroundEnhancer:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, include_photos: bool = False):
         """
         Initialize the playground enhancer with Google Places API key
         
         Args:
             api_key: Google Places API key (optional, will use from env if not provided)
+            include_photos: Also request photos to fill in photos_available
         """
         self.api_key = api_key or os.getenv('GOOGLE_PLACES_API_KEY')
-        logger.info(f"API Key loaded: {'Not found' if not self.api_key else 'Found (length: ' + str(len(self.api_key)) + ')'}")
+        self.fields = PLACE_DETAILS_FIELDS + ['photos'] if include_photos else PLACE_DETAILS_FIELDS
+        self.include_photos = include_photos
+        self.limiter = AsyncRateLimiter(PLACES_QPS)
+        logger.info("API Key loaded: %s", f"Found (length: {len(self.api_key)})" if self.api_key else "Not found")
         
         if not self.api_key:
             raise ValueError("Google Places API key not found. Please set GOOGLE_PLACES_API_KEY in .env file")
             
-        self.gmaps = googlemaps.Client(key=self.api_key)
+        self.cache = diskcache.Cache(PLACES_CACHE_DIR)
+        
+        # Every playground enhanced in this run shares one last_updated value
+        self.run_timestamp = datetime.now().isoformat()
         logger.info("PlaygroundEnhancer initialized successfully")
         
     def load_csv(self, file_path: str) -> pd.DataFrame:
@@ -58,25 +107,57 @@ class PlaygroundEnhancer:
             if not Path(file_path).exists():
                 raise FileNotFoundError(f"CSV file not found: {file_path}")
                 
-            df = pd.read_csv(file_path)
+            # Check the header first, then load only the columns used
             required_columns = {'name', 'location', 'postcode'}
-            missing_columns = required_columns - set(df.columns)
+            missing_columns = required_columns - set(pd.read_csv(file_path, nrows=0).columns)
             
             if missing_columns:
                 raise ValueError(f"Missing required columns: {missing_columns}")
                 
-            logger.info(f"Successfully loaded {len(df)} playgrounds from {file_path}")
+            df = pd.read_csv(file_path, engine='pyarrow', usecols=sorted(required_columns), dtype=str)
+
+            logger.info("Successfully loaded %d playgrounds from %s", len(df), file_path)
             return df
             
         except Exception as e:
-            logger.error(f"Error loading CSV file: {e}")
+            logger.error("Error loading CSV file: %s", e)
             raise
             
-    def enhance_playground(self, name: str, location: str, postcode: str) -> Dict:
+    async def _places_request(self, session: aiohttp.ClientSession, url: str, params: Dict) -> Dict:
+        """
+        Call a Places API endpoint and return its decoded JSON response
+        
+        Requests are spaced to PLACES_QPS, and throttled or unavailable
+        responses (HTTP 429/503 or OVER_QUERY_LIMIT) are retried with
+        exponential backoff.
+        
+        Raises:
+            RuntimeError: If the API reports anything other than OK or ZERO_RESULTS
+        """
+        for attempt in range(PLACES_MAX_RETRIES):
+            last_attempt = attempt == PLACES_MAX_RETRIES - 1
+            await self.limiter.acquire()
+            async with session.get(url, params={**params, 'key': self.api_key}) as response:
+                if response.status in RETRYABLE_STATUS_CODES and not last_attempt:
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                response.raise_for_status()
+                data = await response.json()
+                
+            status = data.get('status')
+            if status == 'OVER_QUERY_LIMIT' and not last_attempt:
+                await asyncio.sleep(2 ** attempt)
+                continue
+            if status not in ('OK', 'ZERO_RESULTS'):
+                raise RuntimeError(f"Places API error {status}: {data.get('error_message', '')}")
+            return data
+        
+    async def enhance_playground(self, session: aiohttp.ClientSession, name: str, location: str, postcode: str) -> Dict:
         """
         Enhance a single playground with Google Places data
         
         Args:
+            session: HTTP session shared by concurrent lookups
             name: Name of the playground
             location: Location/area of the playground
             postcode: Postcode of the playground
@@ -84,58 +165,68 @@ class PlaygroundEnhancer:
         Returns:
             Dictionary containing enhanced playground data
         """
+        # Reuse the result of an earlier run for the same search and field set
+        fields = ','.join(self.fields)
+        cache_key = hashlib.sha1(f"{name}|{location}|{postcode}|{fields}".lower().encode()).hexdigest()
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            # The key ignores case, so report this row's own original values
+            return {**cached, 'original_name': name, 'original_location': location, 'original_postcode': postcode}
+            
         try:
-            logger.debug(f"Processing playground: {name}")
+            logger.debug("Processing playground: %s", name)
             
             # Search query combining name, location and postcode
             search_query = f"{name} playground {location} {postcode}"
             
             # Search for the playground
-            places_result = self.gmaps.places(query=search_query)
+            places_result = await self._places_request(session, PLACES_TEXT_SEARCH_URL, {'query': search_query})
             
             if not places_result['results']:
-                logger.warning(f"No Google Places results found for: {search_query}")
-                return self._create_basic_data(name, location, postcode)
+                logger.warning("No Google Places results found for: %s", search_query)
+                basic_data = self._create_basic_data(name, location, postcode)
+                self.cache.set(cache_key, basic_data, expire=PLACES_CACHE_TTL)
+                return basic_data
                 
             # Get first result
             place = places_result['results'][0]
             place_id = place['place_id']
             
             # Get detailed place information
-            details = self.gmaps.place(
-                place_id=place_id,
-                fields=[
-                    'name', 'formatted_address', 'geometry', 'rating',
-                    'user_ratings_total', 'opening_hours', 'formatted_phone_number',
-                    'website', 'reviews', 'photos', 'wheelchair_accessible_entrance'
-                ]
-            )
+            details = await self._places_request(session, PLACE_DETAILS_URL, {
+                'place_id': place_id,
+                'fields': fields
+            })
             
             # Extract and format the enhanced data
+            result = details['result']
+            coordinates = (result.get('geometry') or {}).get('location') or {}
             enhanced_data = {
                 'original_name': name,
                 'original_location': location,
                 'original_postcode': postcode,
                 'google_place_id': place_id,
-                'name': details['result'].get('name', name),
-                'address': details['result'].get('formatted_address', ''),
-                'latitude': details['result'].get('geometry', {}).get('location', {}).get('lat'),
-                'longitude': details['result'].get('geometry', {}).get('location', {}).get('lng'),
-                'rating': details['result'].get('rating', None),
-                'total_ratings': details['result'].get('user_ratings_total', 0),
-                'phone': details['result'].get('formatted_phone_number', ''),
-                'website': details['result'].get('website', ''),
-                'wheelchair_accessible': details['result'].get('wheelchair_accessible_entrance', False),
-                'opening_hours': self._format_opening_hours(details['result'].get('opening_hours', {})),
-                'photos_available': len(details['result'].get('photos', [])),
-                'last_updated': pd.Timestamp.now().isoformat()
+                'name': result.get('name', name),
+                'address': result.get('formatted_address', ''),
+                'latitude': coordinates.get('lat'),
+                'longitude': coordinates.get('lng'),
+                'rating': result.get('rating'),
+                'total_ratings': result.get('user_ratings_total', 0),
+                'phone': result.get('formatted_phone_number', ''),
+                'website': result.get('website', ''),
+                'wheelchair_accessible': result.get('wheelchair_accessible_entrance', False),
+                'opening_hours': self._format_opening_hours(result.get('opening_hours', {})),
+                'last_updated': self.run_timestamp
             }
+            if self.include_photos:
+                enhanced_data['photos_available'] = len(result.get('photos', []))
             
-            logger.info(f"Successfully enhanced playground: {name}")
+            logger.info("Successfully enhanced playground: %s", name)
+            self.cache.set(cache_key, enhanced_data, expire=PLACES_CACHE_TTL)
             return enhanced_data
             
         except Exception as e:
-            logger.error(f"Error enhancing playground {name}: {e}")
+            logger.error("Error enhancing playground %s: %s", name, e)
             return self._create_basic_data(name, location, postcode, error=str(e))
             
     def _create_basic_data(self, name: str, location: str, postcode: str, error: str = '') -> Dict:
@@ -145,7 +236,7 @@ class PlaygroundEnhancer:
             'original_location': location,
             'original_postcode': postcode,
             'error': error,
-            'last_updated': pd.Timestamp.now().isoformat()
+            'last_updated': self.run_timestamp
         }
         
     def _format_opening_hours(self, hours_data: Dict) -> Dict:
@@ -158,8 +249,94 @@ class PlaygroundEnhancer:
             'hours': hours_data.get('weekday_text', [])
         }
         
+    async def iter_enhanced(self, df: pd.DataFrame) -> AsyncIterator[Dict]:
+        """
+        Enhance every playground in the DataFrame concurrently
+        
+        Args:
+            df: DataFrame with name, location and postcode columns
+            
+        Yields:
+            Enhanced data dictionaries as each lookup completes
+        """
+        semaphore = asyncio.Semaphore(PLACES_CONCURRENCY)
+        
+        async def process(session: aiohttp.ClientSession, playground: pd.Series) -> Dict:
+            async with semaphore:
+                return await self.enhance_playground(
+                    session,
+                    name=playground['name'],
+                    location=playground['location'],
+                    postcode=playground['postcode']
+                )
+            
+        connector = aiohttp.TCPConnector(limit_per_host=PLACES_CONNECTIONS_PER_HOST)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            tasks = [asyncio.create_task(process(session, playground)) for _, playground in df.iterrows()]
+            for task in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Enhancing playgrounds"):
+                yield await task
+                
+    async def enhance_to_csv(self, df: pd.DataFrame, output_file: str) -> Tuple[int, Optional[Dict]]:
+        """
+        Enhance playgrounds and append each result to a CSV as soon as it completes
+        
+        Playgrounds already enhanced without error in an existing output file
+        are skipped, so an interrupted run resumes where it stopped. Rows that
+        failed are dropped from the file and looked up again.
+        
+        Args:
+            df: DataFrame with name, location and postcode columns
+            output_file: Path of the CSV to write or extend
+            
+        Returns:
+            Number of playgrounds written and the first one written (None if none were)
+        """
+        done = set()
+        resume = False
+        if Path(output_file).exists():
+            with open(output_file, newline='') as f:
+                reader = csv.DictReader(f)
+                # Files written with other columns are replaced, not extended
+                resume = reader.fieldnames == ENHANCED_FIELDS
+                rows = list(reader) if resume else []
+            kept = [row for row in rows if not row['error']]
+            done = {(row['original_name'], row['original_location'], row['original_postcode']) for row in kept}
+            
+            # Drop failed rows before appending their retries, so each
+            # playground keeps a single row
+            if len(kept) < len(rows):
+                tmp_file = f"{output_file}.tmp"
+                with open(tmp_file, 'w', newline='') as f:
+                    writer = csv.DictWriter(f, fieldnames=ENHANCED_FIELDS)
+                    writer.writeheader()
+                    writer.writerows(kept)
+                os.replace(tmp_file, output_file)
+                logger.info("Retrying %d failed playgrounds from %s", len(rows) - len(kept), output_file)
+        # Missing values are written as '' by csv, so compare them the same way
+        columns = ['name', 'location', 'postcode']
+        df = df.assign(**{col: df[col].fillna('').astype(str) for col in columns})
+        keys = zip(*(df[col] for col in columns))
+        pending = df[[key not in done for key in keys]]
+        if resume:
+            logger.info("Resuming: %d playgrounds already in %s", len(df) - len(pending), output_file)
+            
+        written = 0
+        first = None
+        with open(output_file, 'a' if resume else 'w', newline='') as out:
+            writer = csv.DictWriter(out, fieldnames=ENHANCED_FIELDS, extrasaction='ignore')
+            if not resume:
+                writer.writeheader()
+            async for enhanced_data in self.iter_enhanced(pending):
+                writer.writerow(enhanced_data)
+                out.flush()
+                written += 1
+                first = first or enhanced_data
+        return written, first
+        
+
 def main():
     """Main function to process all playgrounds"""
+    _setup_logging()
     try:
         # Initialize enhancer
         enhancer = PlaygroundEnhancer()
@@ -167,40 +344,24 @@ def main():
         # Load playground data
         df = enhancer.load_csv('playgrounds.csv')
         
-        # Process all playgrounds
-        enhanced_data_list = []
-        for index, playground in df.iterrows():
-            logger.info(f"Processing playground {index + 1}/{len(df)}: {playground['name']}")
-            enhanced_data = enhancer.enhance_playground(
-                name=playground['name'],
-                location=playground['location'],
-                postcode=playground['postcode']
-            )
-            enhanced_data_list.append(enhanced_data)
-            
-            # Print progress
-            print(f"\rProcessed {index + 1}/{len(df)} playgrounds", end='')
-            
-        print("\n")  # New line after progress
-        
-        # Convert to DataFrame and save
-        enhanced_df = pd.DataFrame(enhanced_data_list)
+        # Process all playgrounds, streaming results to disk
         output_file = 'enhanced_playgrounds.csv'
-        enhanced_df.to_csv(output_file, index=False)
-        logger.info(f"Enhanced data saved to {output_file}")
+        written, sample = asyncio.run(enhancer.enhance_to_csv(df, output_file))
+        logger.info("Enhanced data saved to %s", output_file)
         
         # Print summary
         print("\nProcessing Summary:")
-        print(f"Total playgrounds processed: {len(df)}")
+        print(f"Total playgrounds processed: {written}")
         print(f"Enhanced data saved to: {output_file}")
         
         # Print sample of enhanced data
-        print("\nSample of enhanced data (first playground):")
-        for key, value in enhanced_data_list[0].items():
-            print(f"{key}: {value}")
+        if sample:
+            print("\nSample of enhanced data (first playground):")
+            for key, value in sample.items():
+                print(f"{key}: {value}")
                 
     except Exception as e:
-        logger.error(f"Error in main: {e}")
+        logger.error("Error in main: %s", e)
         raise
 
 if __name__ == "__main__":
@@ -1,27 +1,75 @@
+import ahocorasick
 import pandas as pd
+from tqdm import tqdm
+import diskcache
 import googlemaps
 import os
 from dotenv import load_dotenv
 import logging
 from typing import Dict, List, Optional
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-import re
+from statistics import fmean
+from rate_limiter import RateLimiter
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=os.getenv('LOG_LEVEL', 'INFO'),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('playground_reviews.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+def _setup_logging():
+    """Configure logging for a command-line run"""
+    logging.basicConfig(
+        level=os.getenv('LOG_LEVEL', 'INFO'),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('playground_reviews.log'),
+            logging.StreamHandler()
+        ]
+    )
+
+# Fetched reviews are reused across runs for 30 days
+REVIEWS_CACHE_DIR = '.places_reviews_cache'
+REVIEWS_CACHE_TTL = 30 * 86400
+
+# Keywords to track in review text, by category
+REVIEW_KEYWORDS = {
+    'safety': ['safe', 'secure', 'dangerous', 'unsafe'],
+    'cleanliness': ['clean', 'dirty', 'tidy', 'mess', 'rubbish'],
+    'equipment': ['swing', 'slide', 'climbing', 'sandbox', 'roundabout', 'seesaw'],
+    'age_groups': ['toddler', 'young', 'older', 'age', 'year old'],
+    'maintenance': ['maintain', 'broken', 'repair', 'new', 'old'],
+    'shade': ['shade', 'sun', 'shelter', 'covered'],
+    'seating': ['bench', 'seat', 'sit', 'rest'],
+    'parking': ['park', 'parking', 'car'],
+    'toilets': ['toilet', 'bathroom', 'changing']
+}
+
+EQUIPMENT_KEYWORDS = frozenset(REVIEW_KEYWORDS['equipment'])
+
+def build_review_automaton() -> ahocorasick.Automaton:
+    """Aho-Corasick automaton mapping each review keyword to its category"""
+    automaton = ahocorasick.Automaton()
+    for category, words in REVIEW_KEYWORDS.items():
+        for word in words:
+            automaton.add_word(word, (word, category))
+    automaton.make_automaton()
+    return automaton
+
+# Finds every keyword occurrence in one pass, including ones nested in
+# longer words ('park' in 'parking', 'safe' in 'unsafe'), matching the
+# substring checks it replaces
+REVIEW_KEYWORD_AUTOMATON = build_review_automaton()
+
+# Places API request budget, and retries for throttled or unavailable responses
+PLACES_QPS = 50
+PLACES_MAX_RETRIES = 5
+RETRYABLE_STATUS_CODES = (429, 503)
+
+# Places fetched concurrently; lookups are I/O-bound and share one client
+PLACES_WORKERS = 50
+
 class PlaygroundReviewSummarizer:
     def __init__(self, api_key: Optional[str] = None):
         """Initialize with Google Places API key"""
@@ -30,6 +78,8 @@ class PlaygroundReviewSummarizer:
             raise ValueError("Google Places API key not found. Please set GOOGLE_PLACES_API_KEY in .env file")
             
         self.gmaps = googlemaps.Client(key=self.api_key)
+        self.cache = diskcache.Cache(REVIEWS_CACHE_DIR)
+        self.limiter = RateLimiter(PLACES_QPS)
         logger.info("PlaygroundReviewSummarizer initialized successfully")
         
     def get_place_reviews(self, place_id: str) -> List[Dict]:
@@ -38,18 +88,37 @@ class PlaygroundReviewSummarizer:
             if not place_id:
                 return []
                 
-            # Get detailed place information including reviews
-            details = self.gmaps.place(
-                place_id=place_id,
-                fields=['reviews', 'rating', 'user_ratings_total']
-            )
+            cached = self.cache.get(place_id)
+            if cached is not None:
+                return cached
+                
+            # Get detailed place information including reviews, backing off
+            # exponentially while the API is throttling or unavailable
+            for attempt in range(PLACES_MAX_RETRIES):
+                self.limiter.acquire()
+                try:
+                    details = self.gmaps.place(
+                        place_id=place_id,
+                        fields=['reviews', 'rating', 'user_ratings_total']
+                    )
+                    break
+                except googlemaps.exceptions.HTTPError as e:
+                    if e.status_code not in RETRYABLE_STATUS_CODES or attempt == PLACES_MAX_RETRIES - 1:
+                        raise
+                    time.sleep(2 ** attempt)
             
-            return details.get('result', {}).get('reviews', [])
+            reviews = details.get('result', {}).get('reviews', [])
+            self.cache.set(place_id, reviews, expire=REVIEWS_CACHE_TTL)
+            return reviews
             
         except Exception as e:
-            logger.error(f"Error fetching reviews for place_id {place_id}: {e}")
+            logger.error("Error fetching reviews for place_id %s: %s", place_id, e)
             return []
             
+    def summarize_place(self, place_id: str) -> str:
+        """Fetch and summarize the reviews for one place ID"""
+        return self.summarize_reviews(self.get_place_reviews(place_id))
+        
     def summarize_reviews(self, reviews: List[Dict]) -> str:
         """Generate a parent-friendly summary from reviews"""
         if not reviews:
@@ -73,49 +142,35 @@ class PlaygroundReviewSummarizer:
         negative_aspects = set()
         age_mentions = set()
         
-        # Keywords to track
-        keywords = {
-            'safety': ['safe', 'secure', 'dangerous', 'unsafe'],
-            'cleanliness': ['clean', 'dirty', 'tidy', 'mess', 'rubbish'],
-            'equipment': ['swing', 'slide', 'climbing', 'sandbox', 'roundabout', 'seesaw'],
-            'age_groups': ['toddler', 'young', 'older', 'age', 'year old'],
-            'maintenance': ['maintain', 'broken', 'repair', 'new', 'old'],
-            'shade': ['shade', 'sun', 'shelter', 'covered'],
-            'seating': ['bench', 'seat', 'sit', 'rest'],
-            'parking': ['park', 'parking', 'car'],
-            'toilets': ['toilet', 'bathroom', 'changing']
-        }
-        
         # Analyze reviews
         for review in reviews:
             text = review.get('text', '').lower()
             rating = review.get('rating', 0)
             
+            # Every keyword in the text, found in a single scan
+            found = dict(match for _, match in REVIEW_KEYWORD_AUTOMATON.iter(text))
+            
             # Track mentions
-            for category, words in keywords.items():
-                if any(word in text for word in words):
-                    mentions[category] += 1
+            for category in set(found.values()):
+                mentions[category] += 1
                     
             # Track sentiment based on rating
             if rating >= 4:
-                if 'clean' in text: positive_aspects.add('cleanliness')
-                if 'safe' in text: positive_aspects.add('safety')
-                if any(word in text for word in keywords['equipment']): 
-                    for word in keywords['equipment']:
-                        if word in text:
-                            equipment_types.add(word)
+                if 'clean' in found: positive_aspects.add('cleanliness')
+                if 'safe' in found: positive_aspects.add('safety')
+                equipment_types.update(EQUIPMENT_KEYWORDS.intersection(found))
             elif rating <= 2:
-                if 'dirty' in text: negative_aspects.add('cleanliness')
-                if 'unsafe' in text: negative_aspects.add('safety')
-                if 'broken' in text: negative_aspects.add('maintenance')
+                if 'dirty' in found: negative_aspects.add('cleanliness')
+                if 'unsafe' in found: negative_aspects.add('safety')
+                if 'broken' in found: negative_aspects.add('maintenance')
                 
             # Track age group mentions
-            if 'toddler' in text: age_mentions.add('toddlers')
-            if 'young' in text: age_mentions.add('young children')
-            if 'older' in text: age_mentions.add('older children')
+            if 'toddler' in found: age_mentions.add('toddlers')
+            if 'young' in found: age_mentions.add('young children')
+            if 'older' in found: age_mentions.add('older children')
             
         # Generate summary
-        avg_rating = sum(review.get('rating', 0) for review in reviews) / len(reviews)
+        avg_rating = fmean(review.get('rating', 0) for review in reviews)
         
         summary_parts = []
         
@@ -165,40 +220,37 @@ class PlaygroundReviewSummarizer:
         try:
             # Read the CSV file
             df = pd.read_csv(input_file)
-            logger.info(f"Loaded {len(df)} playgrounds from {input_file}")
+            logger.info("Loaded %d playgrounds from %s", len(df), input_file)
             
             # Initialize description column if it doesn't exist
             if 'description' not in df.columns:
                 df['description'] = ''
                 
-            # Process each playground
-            for index, row in df.iterrows():
-                place_id = row.get('google_place_id', '')
-                if not place_id:
-                    logger.warning(f"No place_id for playground at index {index}")
-                    continue
+            # Process each playground, collecting descriptions for one
+            # assignment at the end
+            descriptions = df['description'].tolist()
+            place_ids = df['google_place_id'] if 'google_place_id' in df.columns else [''] * len(df)
+            names = df['name'] if 'name' in df.columns else ['Unknown'] * len(df)
+            with ThreadPoolExecutor(max_workers=PLACES_WORKERS) as executor:
+                futures = {}
+                for i, (place_id, name) in enumerate(zip(place_ids, names)):
+                    if not place_id or pd.isna(place_id):
+                        logger.warning("No place_id for playground at index %s", df.index[i])
+                        continue
+                        
+                    logger.info("Processing playground %d/%d: %s", i + 1, len(df), name)
+                    futures[executor.submit(self.summarize_place, place_id)] = i
                     
-                logger.info(f"Processing playground {index + 1}/{len(df)}: {row.get('name', 'Unknown')}")
-                
                 # Get and summarize reviews
-                reviews = self.get_place_reviews(place_id)
-                summary = self.summarize_reviews(reviews)
-                
-                # Update description
-                df.at[index, 'description'] = summary
-                
-                # Print progress
-                print(f"\rProcessed {index + 1}/{len(df)} playgrounds", end='')
-                
-                # Add delay to respect API limits
-                time.sleep(2)
-                
-            print("\n")  # New line after progress
+                for future in tqdm(as_completed(futures), total=len(futures), desc="Summarizing reviews"):
+                    descriptions[futures[future]] = future.result()
+                    
+            df['description'] = descriptions
             
             # Save results
             output_file = output_file or input_file.replace('.csv', '_with_descriptions.csv')
             df.to_csv(output_file, index=False)
-            logger.info(f"Enhanced data saved to {output_file}")
+            logger.info("Enhanced data saved to %s", output_file)
             
             # Print summary
             print(f"\nProcessing Summary:")
@@ -206,11 +258,12 @@ class PlaygroundReviewSummarizer:
             print(f"Enhanced data saved to: {output_file}")
             
         except Exception as e:
-            logger.error(f"Error processing playgrounds: {e}")
+            logger.error("Error processing playgrounds: %s", e)
             raise
 
 def main():
     """Main function to process all playgrounds and check data completeness"""
+    _setup_logging()
     try:
         # Initialize summarizer
         summarizer = PlaygroundReviewSummarizer()
@@ -218,61 +271,49 @@ def main():
         # Load the CSV file
         input_file = "playground_clean - v.3.csv"
         df = pd.read_csv(input_file)
-        logger.info(f"Loaded {len(df)} playgrounds")
+        logger.info("Loaded %d playgrounds", len(df))
         
         # Initialize or update description column
         if 'description' not in df.columns:
             df['description'] = ''
             
-        # Track missing data
-        missing_data = []
-        processed_count = 0
-        skipped_count = 0
-        
-        # Process each playground
+        # Fetch and summarize each distinct place once; chains and merged
+        # duplicates share a place_id
         total_playgrounds = len(df)
-        for index, playground in df.iterrows():
-            name = playground.get('name', 'Unknown')
-            print(f"\rProcessing {index + 1}/{total_playgrounds}: {name}", end='')
-            
-            # Check for required data
-            place_id = playground.get('place_id')
-            if not place_id:
-                missing_data.append({
-                    'name': name,
-                    'reason': 'Missing place_id',
-                    'index': index
-                })
-                skipped_count += 1
-                continue
+        place_ids = df['place_id'].where(df['place_id'].notna() & (df['place_id'] != ''))
+        unique_ids = place_ids.dropna().unique()
+        summaries = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=PLACES_WORKERS) as executor:
+            futures = {executor.submit(summarizer.summarize_place, place_id): place_id for place_id in unique_ids}
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Summarizing reviews"):
+                place_id = futures[future]
+                try:
+                    summaries[place_id] = future.result()
+                except Exception as e:
+                    errors[place_id] = str(e)
+                    logger.error("Error processing place %s: %s", place_id, e)
                 
-            try:
-                # Get and summarize reviews
-                reviews = summarizer.get_place_reviews(place_id)
-                summary = summarizer.summarize_reviews(reviews)
-                
-                # Update description
-                df.at[index, 'description'] = summary
-                processed_count += 1
-                
-                # Add delay to respect API limits
-                time.sleep(2)
-                
-            except Exception as e:
-                missing_data.append({
-                    'name': name,
-                    'reason': f'Error: {str(e)}',
-                    'index': index
-                })
-                skipped_count += 1
-                logger.error(f"Error processing playground {name}: {e}")
-                
-        print("\n")  # New line after progress
+        # Broadcast summaries back to every row; rows without one keep
+        # their existing description
+        new_descriptions = place_ids.map(summaries)
+        df['description'] = new_descriptions.fillna(df['description'])
+        processed_count = int(new_descriptions.notna().sum())
+        skipped_count = total_playgrounds - processed_count
         
+        # Track missing data
+        missing_data = []
+        for index, place_id in place_ids[new_descriptions.isna()].items():
+            missing_data.append({
+                'name': df.at[index, 'name'] if 'name' in df.columns else 'Unknown',
+                'reason': 'Missing place_id' if pd.isna(place_id) else f'Error: {errors[place_id]}',
+                'index': index
+            })
+            
         # Save updated data
         output_file = input_file.replace('.csv', '_with_descriptions.csv')
         df.to_csv(output_file, index=False)
-        logger.info(f"Enhanced data saved to {output_file}")
+        logger.info("Enhanced data saved to %s", output_file)
         
         # Print summary report
         print("\nProcessing Summary:")
@@ -290,26 +331,28 @@ def main():
                 print("-" * 30)
                 
         # Analyze description completeness
-        descriptions = df['description'].fillna('')
-        empty_descriptions = descriptions.str.len() == 0
-        short_descriptions = (descriptions.str.len() > 0) & (descriptions.str.len() < 100)
+        lengths = df['description'].fillna('').str.len().to_numpy()
+        empty_descriptions = lengths == 0
+        short_descriptions = (lengths > 0) & (lengths < 100)
+        empty_count = int(empty_descriptions.sum())
+        short_count = int(short_descriptions.sum())
         
         print("\nDescription Analysis:")
         print("-" * 50)
-        print(f"Complete descriptions: {len(df) - sum(empty_descriptions) - sum(short_descriptions)}")
-        print(f"Short descriptions (<100 chars): {sum(short_descriptions)}")
-        print(f"Empty descriptions: {sum(empty_descriptions)}")
+        print(f"Complete descriptions: {len(df) - empty_count - short_count}")
+        print(f"Short descriptions (<100 chars): {short_count}")
+        print(f"Empty descriptions: {empty_count}")
         
         # Sample of complete description
         if not empty_descriptions.all():
             print("\nSample Complete Description:")
             print("-" * 50)
-            sample = df[~empty_descriptions].iloc[0]
+            sample = df.loc[~empty_descriptions].iloc[0]
             print(f"Playground: {sample['name']}")
             print(sample['description'])
         
     except Exception as e:
-        logger.error(f"Error in main: {e}")
+        logger.error("Error in main: %s", e)
         raise
 
 if __name__ == "__main__":
@@ -0,0 +1,34 @@
+import asyncio
+import threading
+from time import monotonic, sleep
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls at most `rate` per second"""
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.lock = threading.Lock()
+        self.next_slot = monotonic()
+        
+    def acquire(self):
+        """Block until the caller may make its next call"""
+        with self.lock:
+            now = monotonic()
+            wait = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if wait > 0:
+            sleep(wait)
+
+class AsyncRateLimiter:
+    """Limiter spacing coroutine calls at most `rate` per second"""
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.next_slot = monotonic()
+        
+    async def acquire(self):
+        """Wait until the caller may make its next call"""
+        # Runs on one event loop, so reserving the slot needs no lock
+        now = monotonic()
+        wait = self.next_slot - now
+        self.next_slot = max(now, self.next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
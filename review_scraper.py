@@ -1,11 +1,11 @@
+import asyncio
+import diskcache
+import httpx
 import pandas as pd
-import time
 import random
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+import time
+from selectolax.parser import HTMLParser
+from tqdm.asyncio import tqdm_asyncio
 import logging
 from typing import List, Dict, Optional
 from fake_useragent import UserAgent
@@ -22,14 +22,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Playgrounds scraped at once; each still waits a random delay between requests
+SCRAPE_CONCURRENCY = 4
+
+# Search results and review pages are reused across runs for 30 days; empty
+# ones (often a blocked or changed page) are retried after a day
+SEARCH_CACHE_DIR = '.tripadvisor_search'
+REVIEWS_CACHE_DIR = '.tripadvisor_reviews'
+SCRAPE_CACHE_TTL = 30 * 86400
+SCRAPE_EMPTY_CACHE_TTL = 86400
+
+# Elements that wrap the search results and the reviews. A page without its
+# container was blocked or is built by JavaScript, and is rendered in the
+# browser instead; a container with no entries is a genuinely empty page.
+SEARCH_RESULTS_CONTAINER = '.search-results-list'
+REVIEWS_CONTAINER = '#REVIEWS'
+
 class ReviewScraper:
     def __init__(self):
-        """Initialize the review scraper with Selenium WebDriver"""
-        self.setup_driver()
+        """Initialize the review scraper"""
         self.user_agent = UserAgent()
+        # Headless Chrome, started only when a static page was blocked or
+        # lacks its container; one page is rendered at a time
+        self.driver = None
+        self.browser_lock = asyncio.Lock()
+        self.search_cache = diskcache.Cache(SEARCH_CACHE_DIR)
+        self.reviews_cache = diskcache.Cache(REVIEWS_CACHE_DIR)
         
     def setup_driver(self):
         """Set up Chrome WebDriver with appropriate options"""
+        # Selenium is only needed for the fallback, so import it on first use
+        from selenium import webdriver
         options = webdriver.ChromeOptions()
         options.add_argument('--headless')
         options.add_argument('--no-sandbox')
@@ -37,67 +60,158 @@ class ReviewScraper:
         options.add_argument(f'user-agent={UserAgent().random}')
         self.driver = webdriver.Chrome(options=options)
         
-    def search_tripadvisor(self, playground_name: str, location: str) -> Optional[str]:
+    def render_page(self, url: str, container: str, expand: bool = False) -> str:
+        """Load a page in the browser and return its HTML once container appears"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException, NoSuchElementException
+        
+        if self.driver is None:
+            self.setup_driver()
+        self.driver.get(url)
+        try:
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, container))
+            )
+        except TimeoutException:
+            return self.driver.page_source
+            
+        # Click "More" button to expand reviews if present
+        if expand:
+            try:
+                self.driver.find_element(By.CLASS_NAME, "Expand").click()
+                time.sleep(1)
+            except NoSuchElementException:
+                pass
+        return self.driver.page_source
+        
+    async def fetch_page(self, client: httpx.AsyncClient, url: str, container: str, expand: bool = False) -> str:
+        """
+        Fetch a page's HTML, rendering it in the browser only when the static
+        response was refused or lacks the container element
+        """
+        response = await client.get(url, headers={'user-agent': self.user_agent.random})
+        if response.status_code == 200 and HTMLParser(response.text).css_first(container) is not None:
+            return response.text
+            
+        logger.info(f"Static page unusable (HTTP {response.status_code}), rendering with browser: {url}")
+        async with self.browser_lock:
+            return await asyncio.to_thread(self.render_page, url, container, expand)
+            
+    def close(self):
+        """Quit the browser if the fallback started one"""
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
+            
+    def search_key(self, playground_name: str, location: str) -> str:
+        """Search cache key; rows for the same playground share it"""
+        return f"{str(playground_name).lower()}|{str(location).lower()}"
+        
+    async def search_tripadvisor(self, client: httpx.AsyncClient, playground_name: str, location: str) -> Optional[str]:
         """Search for playground on TripAdvisor and return the attraction URL"""
+        key = self.search_key(playground_name, location)
+        cached = self.search_cache.get(key)
+        if cached is not None:
+            return cached or None
+            
         try:
             search_query = quote(f"{playground_name} {location} playground")
             search_url = f"https://www.tripadvisor.com/Search?q={search_query}"
             
             logger.info(f"Searching TripAdvisor for: {playground_name}")
-            self.driver.get(search_url)
-            
-            # Wait for search results
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "result-title"))
-            )
+            html = await self.fetch_page(client, search_url, SEARCH_RESULTS_CONTAINER)
             
             # Get first result
-            results = self.driver.find_elements(By.CLASS_NAME, "result-title")
-            if results:
-                href = results[0].get_attribute("href")
-                return href
-                
+            result = HTMLParser(html).css_first('.result-title')
+            if result is None:
+                logger.warning(f"No TripAdvisor search results in page for: {playground_name}")
+                self.search_cache.set(key, '', expire=SCRAPE_EMPTY_CACHE_TTL)
+                return None
+            href = result.attributes.get('href')
+            url = str(httpx.URL(search_url).join(href)) if href else ''
+            self.search_cache.set(key, url, expire=SCRAPE_CACHE_TTL if url else SCRAPE_EMPTY_CACHE_TTL)
+            return url or None
+            
         except Exception as e:
             logger.error(f"Error searching TripAdvisor: {e}")
             
         return None
         
-    def get_tripadvisor_reviews(self, url: str) -> List[Dict]:
+    async def get_tripadvisor_reviews(self, client: httpx.AsyncClient, url: str) -> List[Dict]:
         """Scrape reviews from TripAdvisor"""
+        cached = self.reviews_cache.get(url)
+        if cached is not None:
+            return cached
+            
         reviews = []
         try:
-            self.driver.get(url)
-            time.sleep(random.uniform(2, 4))  # Random delay
-            
-            # Click "More" button to expand reviews if present
-            try:
-                more_button = self.driver.find_element(By.CLASS_NAME, "Expand")
-                more_button.click()
-                time.sleep(1)
-            except:
-                pass
-                
-            # Get review elements
-            review_elements = self.driver.find_elements(By.CLASS_NAME, "review-container")
-            
-            for element in review_elements:
-                try:
-                    review = {
-                        'title': element.find_element(By.CLASS_NAME, "title").text,
-                        'text': element.find_element(By.CLASS_NAME, "text").text,
-                        'rating': element.find_element(By.CLASS_NAME, "ui_bubble_rating").get_attribute("class"),
-                        'date': element.find_element(By.CLASS_NAME, "ratingDate").get_attribute("title"),
-                        'source': 'TripAdvisor'
-                    }
-                    reviews.append(review)
-                except:
-                    continue
+            await asyncio.sleep(random.uniform(2, 4))  # Random delay
+            reviews = self.parse_reviews(await self.fetch_page(client, url, REVIEWS_CONTAINER, expand=True))
+            self.reviews_cache.set(url, reviews, expire=SCRAPE_CACHE_TTL if reviews else SCRAPE_EMPTY_CACHE_TTL)
                     
         except Exception as e:
             logger.error(f"Error scraping TripAdvisor reviews: {e}")
             
         return reviews
         
+    def parse_reviews(self, html: str) -> List[Dict]:
+        """Extract reviews from an attraction page"""
+        reviews = []
+        for element in HTMLParser(html).css('.review-container'):
+            title = element.css_first('.title')
+            text = element.css_first('.text')
+            rating = element.css_first('.ui_bubble_rating')
+            date = element.css_first('.ratingDate')
+            if None in (title, text, rating, date):
+                continue
+            reviews.append({
+                'title': title.text(separator=' ', strip=True),
+                'text': text.text(separator=' ', strip=True),
+                'rating': rating.attributes.get('class'),
+                'date': date.attributes.get('title'),
+                'source': 'TripAdvisor'
+            })
+        return reviews
+        
+    async def scrape_playground(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                                name: str, location: str) -> str:
+        """Search for one playground and return its reviews as a string ('' if none)"""
+        async with semaphore:
+            try:
+                # Search on TripAdvisor
+                cached_url = self.search_cache.get(self.search_key(name, location))
+                tripadvisor_url = await self.search_tripadvisor(client, name, location)
+                fetched = cached_url is None or (tripadvisor_url is not None and tripadvisor_url not in self.reviews_cache)
+                reviews = await self.get_tripadvisor_reviews(client, tripadvisor_url) if tripadvisor_url else []
+                
+                # Add random delay between requests (none when everything came from the caches)
+                if fetched:
+                    await asyncio.sleep(random.uniform(3, 6))
+                
+                # Store reviews as JSON string
+                return str(reviews) if reviews else ''
+                
+            except Exception as e:
+                logger.error(f"Error processing playground {name}: {e}")
+                return ''
+                
+    async def scrape_all(self, df: pd.DataFrame) -> List[str]:
+        """Scrape reviews for every playground, SCRAPE_CONCURRENCY at a time"""
+        semaphore = asyncio.Semaphore(SCRAPE_CONCURRENCY)
+        try:
+            async with httpx.AsyncClient(http2=True, follow_redirects=True, timeout=10) as client:
+                return await tqdm_asyncio.gather(
+                    *(
+                        self.scrape_playground(client, semaphore, row['name'], row.get('city', '') or row.get('location', ''))
+                        for _, row in df.iterrows()
+                    ),
+                    desc="Scraping reviews"
+                )
+        finally:
+            self.close()
+            
     def process_playgrounds(self, input_file: str, output_file: str = None):
         """Process all playgrounds and scrape additional reviews"""
         try:
@@ -109,31 +223,9 @@ class ReviewScraper:
             if 'tripadvisor_reviews' not in df.columns:
                 df['tripadvisor_reviews'] = ''
                 
-            # Process each playground
-            for index, row in df.iterrows():
-                try:
-                    name = row['name']
-                    location = row.get('city', '') or row.get('location', '')
-                    
-                    logger.info(f"Processing {index + 1}/{len(df)}: {name}")
-                    print(f"\rProcessing {index + 1}/{len(df)}: {name}", end='')
-                    
-                    # Search on TripAdvisor
-                    tripadvisor_url = self.search_tripadvisor(name, location)
-                    if tripadvisor_url:
-                        reviews = self.get_tripadvisor_reviews(tripadvisor_url)
-                        if reviews:
-                            # Store reviews as JSON string
-                            df.at[index, 'tripadvisor_reviews'] = str(reviews)
-                            
-                    # Add random delay between requests
-                    time.sleep(random.uniform(3, 6))
-                    
-                except Exception as e:
-                    logger.error(f"Error processing playground {name}: {e}")
-                    continue
-                    
-            print("\n")  # New line after progress
+            # Scrape all playgrounds, keeping any reviews from an earlier run
+            scraped = pd.Series(asyncio.run(self.scrape_all(df)), index=df.index)
+            df['tripadvisor_reviews'] = scraped.where(scraped != '', df['tripadvisor_reviews'])
             
             # Save results
             output_file = output_file or input_file.replace('.csv', '_with_additional_reviews.csv')
@@ -150,9 +242,6 @@ class ReviewScraper:
             logger.error(f"Error in process_playgrounds: {e}")
             raise
             
-        finally:
-            self.driver.quit()
-            
 def main():
     """Main function to demonstrate usage"""
     try:
@@ -1,16 +1,35 @@
+import numpy as np
 import pandas as pd
 
+# Cities counted as the London area, including Greater London areas
+LONDON_AREAS = frozenset({'London', 'Uxbridge', 'Romford', 'Ilford', 'Croydon', 'Harrow', 'Enfield', 'Hounslow', 'Wembley', 'Hayes'})
+
+def city_bucket(city) -> str:
+    """Output file prefix for a city"""
+    if city in LONDON_AREAS:
+        return 'london'
+    if city == 'Glasgow':
+        return 'glasgow'
+    return 'other'
+
 # Read the CSV file
 input_file = 'playground_clean - v.3_with_descriptions_with_additional_reviews.csv'
 df = pd.read_csv(input_file)
 
-# Change 'Londres' to 'London'
-df['city'] = df['city'].replace('Londres', 'London')
+# Change 'Londres' to 'London'; as a categorical, each distinct city is
+# stored (and bucketed below) once
+df['city'] = df['city'].replace('Londres', 'London').astype('category')
+
+# Bucket each distinct city, then look rows up by category code. Missing
+# cities have code -1, which picks the trailing 'other'.
+category_buckets = np.array([city_bucket(city) for city in df['city'].cat.categories] + ['other'])
+buckets = category_buckets[df['city'].cat.codes.to_numpy()]
 
-# Create three separate dataframes based on city
-london_df = df[df['city'].isin(['London', 'Uxbridge', 'Romford', 'Ilford', 'Croydon', 'Harrow', 'Enfield', 'Hounslow', 'Wembley', 'Hayes'])]  # Including Greater London areas
-glasgow_df = df[df['city'] == 'Glasgow']
-other_df = df[~df['city'].isin(['London', 'Uxbridge', 'Romford', 'Ilford', 'Croydon', 'Harrow', 'Enfield', 'Hounslow', 'Wembley', 'Hayes', 'Glasgow'])]
+# Split into three dataframes in a single pass
+parts = dict(iter(df.groupby(buckets, sort=False)))
+london_df = parts.get('london', df.iloc[:0])
+glasgow_df = parts.get('glasgow', df.iloc[:0])
+other_df = parts.get('other', df.iloc[:0])
 
 # Save to separate CSV files
 london_df.to_csv('london_playgrounds.csv', index=False)
@@ -22,4 +41,4 @@ print(f"\nPlaygrounds split by city:")
 print(f"London area: {len(london_df)} playgrounds")
 print(f"Glasgow: {len(glasgow_df)} playgrounds")
 print(f"Other locations: {len(other_df)} playgrounds")
-print(f"\nFiles created: london_playgrounds.csv, glasgow_playgrounds.csv, other_playgrounds.csv") 
\ No newline at end of file
+print(f"\nFiles created: london_playgrounds.csv, glasgow_playgrounds.csv, other_playgrounds.csv")